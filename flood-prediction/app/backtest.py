@@ -0,0 +1,207 @@
+"""Backtest alert thresholds against the station history.
+
+    python -m app.backtest --labels floods.csv
+    python -m app.backtest --rainfall-proxy 0.9
+
+Replays every station-month in flood_dataset.csv: each record is scored in
+one batched pass (or read from --predictions), and an alert issued when the
+probability reaches a threshold is checked against whether a flood followed
+`lead` months later. All thresholds and lead times are evaluated together by
+broadcasting, with stations split across a process pool. The threshold with
+the best skill score (critical success index by default) is found per weather
+station and lead time; every district takes the thresholds of its nearest
+station, and the result is written to build/backtest/thresholds.csv.
+
+The dataset has no flood observations, so labels come from a CSV of
+Station, YEAR, Month, Flood (1 for a flood month, stations named as in the
+dataset), from a column of the dataset, or, explicitly, from a rainfall
+proxy: a month counts as a flood when its rainfall reaches the given
+quantile of that station's history.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from app.districts import district_stations
+from app.scoring import DATASET_PATH, load_station_records
+
+DEFAULT_THRESHOLDS = np.round(np.arange(0.05, 0.96, 0.01), 2)
+DEFAULT_LEADS = [0, 1, 2, 3]
+
+OBJECTIVES = {
+    # Critical success index: hits over everything that was either forecast or observed
+    "csi": lambda hits, misses, false_alarms, correct_negatives: hits / (hits + misses + false_alarms),
+    # Peirce skill score: hit rate minus false alarm rate
+    "pss": lambda hits, misses, false_alarms, correct_negatives: (
+        hits / (hits + misses) - false_alarms / (false_alarms + correct_negatives)
+    ),
+}
+
+
+def rainfall_proxy_labels(records, quantile):
+    """1 where a month's rainfall reaches the station's own rainfall quantile, else 0"""
+    cutoff = records.groupby('District')['Rainfall'].transform(lambda rainfall: rainfall.quantile(quantile))
+    return (records['Rainfall'] >= cutoff).astype(float)
+
+
+def station_timelines(frame):
+    """Probability and label matrices, shape (n_stations, n_months), NaN where a month is missing"""
+    start = frame['YEAR'].min()
+    month_index = ((frame['YEAR'] - start) * 12 + frame['Month'] - 1).to_numpy()
+    codes, stations = pd.factorize(frame['District'])
+
+    probability = np.full((len(stations), month_index.max() + 1), np.nan)
+    events = np.full_like(probability, np.nan)
+    probability[codes, month_index] = frame['Flood_Probability'].to_numpy(dtype=float)
+    events[codes, month_index] = frame['Flood'].to_numpy(dtype=float)
+    return stations.to_numpy(), probability, events
+
+
+def contingency(probability, events, thresholds, leads):
+    """Hits, misses, false alarms and correct negatives, each shaped (n_stations, n_thresholds, n_leads)
+
+    An alert at month t counts against the label at month t + lead; pairs with
+    either side missing are left out.
+    """
+    n_stations, n_months = probability.shape
+    future = np.full((n_stations, len(leads), n_months), np.nan)
+    for i, lead in enumerate(leads):
+        future[:, i, :n_months - lead] = events[:, lead:]
+
+    valid = ~np.isnan(probability)[:, None, :] & ~np.isnan(future)
+    observed = (valid & (np.nan_to_num(future) > 0.5)).astype(np.float32)
+    # NaN compares False, so missing months never alert
+    alerts = (probability[:, None, :] >= np.asarray(thresholds)[None, :, None]).astype(np.float32)
+
+    # (stations, thresholds, months) @ (stations, months, leads)
+    hits = alerts @ observed.transpose(0, 2, 1)
+    alarms = alerts @ valid.astype(np.float32).transpose(0, 2, 1)
+    floods = observed.sum(axis=2)[:, None, :]
+    pairs = valid.sum(axis=2)[:, None, :]
+
+    misses = floods - hits
+    false_alarms = alarms - hits
+    correct_negatives = pairs - hits - misses - false_alarms
+    return np.stack([hits, misses, false_alarms, correct_negatives])
+
+
+def run_backtest(frame, thresholds=DEFAULT_THRESHOLDS, leads=DEFAULT_LEADS, workers=None):
+    """Contingency counts for every station, threshold and lead: (stations, counts shaped (4, s, t, l))"""
+    stations, probability, events = station_timelines(frame)
+    chunks = np.array_split(np.arange(len(stations)), min(workers or os.cpu_count() or 1, len(stations)))
+    with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+        parts = pool.map(
+            contingency,
+            [probability[chunk] for chunk in chunks],
+            [events[chunk] for chunk in chunks],
+            [thresholds] * len(chunks),
+            [leads] * len(chunks),
+        )
+        counts = np.concatenate(list(parts), axis=1)
+    return stations, counts
+
+
+def optimal_thresholds(stations, counts, thresholds, leads, objective="csi"):
+    """Best threshold per station and lead time, with its scores and counts"""
+    hits, misses, false_alarms, correct_negatives = counts
+    with np.errstate(divide='ignore', invalid='ignore'):
+        score = OBJECTIVES[objective](hits, misses, false_alarms, correct_negatives)
+        best = np.nan_to_num(score, nan=-np.inf).argmax(axis=1)   # (stations, leads)
+
+        def pick(values):
+            return np.take_along_axis(values, best[:, None, :], axis=1)[:, 0, :]
+
+        hits, misses, false_alarms = pick(hits), pick(misses), pick(false_alarms)
+        result = pd.DataFrame({
+            'Station': np.repeat(stations, len(leads)),
+            'Lead_Months': np.tile(leads, len(stations)),
+            'Threshold': np.asarray(thresholds)[best].ravel(),
+            'Score': pick(score).ravel(),
+            'Hit_Rate': (hits / (hits + misses)).ravel(),
+            'False_Alarm_Ratio': (false_alarms / (hits + false_alarms)).ravel(),
+            'Hits': hits.ravel().astype(int),
+            'Misses': misses.ravel().astype(int),
+            'False_Alarms': false_alarms.ravel().astype(int),
+        })
+    # Without a single flood there is nothing to optimise
+    result.loc[result['Hits'] + result['Misses'] == 0, ['Threshold', 'Score']] = np.nan
+    return result
+
+
+def score_grid(stations, counts, thresholds, leads):
+    """Every (station, threshold, lead) combination as a long table"""
+    index = pd.MultiIndex.from_product([stations, thresholds, leads], names=['Station', 'Threshold', 'Lead_Months'])
+    return pd.DataFrame(
+        counts.reshape(4, -1).T.astype(int),
+        index=index,
+        columns=['Hits', 'Misses', 'False_Alarms', 'Correct_Negatives'],
+    ).reset_index()
+
+
+def district_thresholds(records, station_thresholds):
+    """Rows of optimal_thresholds for every district, from the district's nearest station"""
+    location = records.groupby('District')[['LATITUDE', 'LONGITUDE']].mean()
+    return district_stations(location)[['District', 'Station']].merge(station_thresholds, on='Station')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    parser.add_argument("--predictions", help="CSV with District, YEAR, Month, Flood_Probability (default: score the dataset)")
+    labels = parser.add_mutually_exclusive_group(required=True)
+    labels.add_argument("--labels", help="CSV with Station, YEAR, Month, Flood")
+    labels.add_argument("--label-column", help="column of the dataset holding 0/1 flood labels")
+    labels.add_argument("--rainfall-proxy", type=float, metavar="QUANTILE",
+                        help="treat months with rainfall at or above this quantile of the station's history as floods")
+    parser.add_argument("--leads", type=int, nargs="+", default=DEFAULT_LEADS, help="lead times in months")
+    parser.add_argument("--objective", choices=list(OBJECTIVES), default="csi")
+    parser.add_argument("--workers", type=int, help="number of processes (default: CPU count)")
+    parser.add_argument("--output", default="build/backtest/thresholds.csv")
+    parser.add_argument("--scores", help="also write the counts for every threshold and lead to this CSV")
+    args = parser.parse_args()
+
+    started = time.time()
+    records = load_station_records(args.dataset)
+    keys = ['District', 'YEAR', 'Month']
+    if args.predictions:
+        predictions = pd.read_csv(args.predictions, usecols=keys + ['Flood_Probability'])
+        records = records.merge(predictions, on=keys)
+    else:
+        from app.registry import ModelRegistry
+        from app.scoring import score_station_records
+
+        model = ModelRegistry().current
+        records['Flood_Probability'] = score_station_records(model, model.scaler, records)['Flood_Probability']
+
+    if args.labels:
+        # The dataset's station names are in its District column
+        observed = pd.read_csv(args.labels, usecols=['Station', 'YEAR', 'Month', 'Flood']).rename(columns={'Station': 'District'})
+        records = records.merge(observed, on=keys, how='left')
+    elif args.label_column:
+        records['Flood'] = records[args.label_column].astype(float)
+    else:
+        records['Flood'] = rainfall_proxy_labels(records, args.rainfall_proxy)
+    scored = time.time()
+
+    stations, counts = run_backtest(records, DEFAULT_THRESHOLDS, args.leads, args.workers)
+    result = district_thresholds(records, optimal_thresholds(stations, counts, DEFAULT_THRESHOLDS, args.leads, args.objective))
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    result.to_csv(args.output, index=False)
+    if args.scores:
+        score_grid(stations, counts, DEFAULT_THRESHOLDS, args.leads).to_csv(args.scores, index=False)
+
+    print(
+        f"Backtested {len(records)} station-months x {len(DEFAULT_THRESHOLDS)} thresholds x {len(args.leads)} leads "
+        f"in {time.time() - scored:.2f}s (scoring {scored - started:.1f}s)"
+    )
+    print(result.groupby('Lead_Months')[['Threshold', 'Score']].median().round(2).to_string())
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
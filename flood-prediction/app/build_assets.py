@@ -0,0 +1,108 @@
+"""Generate resized, compressed variants of the images in app/assets.
+
+Run from the flood-prediction directory before deploying:
+
+    python -m app.build_assets
+
+Each image gets a WebP and a JPEG copy at every width in WIDTHS that is
+smaller than the original, and at the original width. A variant is only kept
+when it is smaller than the source file. Variants are only rebuilt when the
+source changes.
+"""
+import argparse
+import json
+import os
+
+from PIL import Image
+
+ASSETS_DIR = "app/assets"
+VARIANTS_DIR = os.path.join(ASSETS_DIR, "variants")
+MANIFEST_NAME = "manifest.json"
+
+WIDTHS = [320, 640, 960, 1280, 1920]
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+FORMATS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 6},
+    "jpg": {"format": "JPEG", "quality": 80, "optimize": True, "progressive": True},
+}
+
+
+def variant_name(source_name, width, extension):
+    stem = os.path.splitext(source_name)[0]
+    return f"{stem}-{width}.{extension}"
+
+
+def build_variants(source_path, output_dir):
+    """Write the variants of one image that are smaller than it and return their manifest entries"""
+    source_name = os.path.basename(source_path)
+    source_bytes = os.path.getsize(source_path)
+    entries = []
+    with Image.open(source_path) as image:
+        image = image.convert("RGB")
+        original_width, original_height = image.size
+        widths = [w for w in WIDTHS if w < original_width] + [original_width]
+
+        for width in widths:
+            height = round(original_height * width / original_width)
+            resized = image if width == original_width else image.resize((width, height), Image.LANCZOS)
+            for extension, options in FORMATS.items():
+                name = variant_name(source_name, width, extension)
+                path = os.path.join(output_dir, name)
+                resized.save(path, **options)
+                size = os.path.getsize(path)
+                # Re-encoding an already small file can make it bigger
+                if size >= source_bytes:
+                    os.remove(path)
+                    continue
+                entries.append({"file": name, "width": width, "format": extension, "bytes": size})
+    return original_width, entries
+
+
+def build_all(assets_dir=ASSETS_DIR, output_dir=VARIANTS_DIR, force=False):
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    for source_name in sorted(os.listdir(assets_dir)):
+        source_path = os.path.join(assets_dir, source_name)
+        if os.path.splitext(source_name)[1].lower() not in IMAGE_EXTENSIONS:
+            continue
+
+        mtime = os.path.getmtime(source_path)
+        previous = manifest.get(source_name)
+        if not force and previous and previous["mtime"] == mtime:
+            print(f"Up to date: {source_name}")
+            continue
+
+        print(f"Building variants for {source_name}...")
+        width, variants = build_variants(source_path, output_dir)
+        manifest[source_name] = {
+            "mtime": mtime,
+            "bytes": os.path.getsize(source_path),
+            "width": width,
+            "variants": variants,
+        }
+
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--assets-dir", default=ASSETS_DIR)
+    parser.add_argument("--output-dir", default=VARIANTS_DIR)
+    parser.add_argument("--force", action="store_true", help="rebuild every variant")
+    args = parser.parse_args()
+
+    manifest = build_all(args.assets_dir, args.output_dir, args.force)
+    for source_name, entry in manifest.items():
+        smallest = min([v["bytes"] for v in entry["variants"]] + [entry["bytes"]])
+        print(f"{source_name}: {entry['bytes'] / 1024:.0f} KB -> {smallest / 1024:.0f} KB smallest variant")
+
+
+if __name__ == "__main__":
+    main()
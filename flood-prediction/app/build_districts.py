@@ -0,0 +1,73 @@
+"""Simplify Bangladesh district boundaries into compact GeoJSON at several zoom levels.
+
+    python -m app.build_districts path/to/gadm41_BGD_2.json --name-field NAME_2
+
+Any boundary file geopandas can read works (GADM level 2, geoBoundaries ADM2,
+...). Polygons are dissolved per district, simplified with each tolerance in
+LEVELS and written with rounded coordinates to app/assets/districts/.
+"""
+import argparse
+import json
+import os
+
+import geopandas as gpd
+
+from app.districts import district_aliases, district_coordinates
+
+OUTPUT_DIR = "app/assets/districts"
+
+# Level name -> (simplification tolerance in degrees, coordinate decimals)
+LEVELS = {
+    "low": (0.02, 3),
+    "medium": (0.005, 4),
+    "high": (0.001, 5),
+}
+
+
+def level_path(level, output_dir=OUTPUT_DIR):
+    return os.path.join(output_dir, f"districts_{level}.geojson")
+
+
+def round_coordinates(coordinates, decimals):
+    if isinstance(coordinates[0], (int, float)):
+        return [round(c, decimals) for c in coordinates]
+    return [round_coordinates(c, decimals) for c in coordinates]
+
+
+def load_boundaries(path, name_field):
+    gdf = gpd.read_file(path).to_crs(epsg=4326)
+    gdf["District"] = gdf[name_field].replace(district_aliases)
+    unknown = sorted(set(gdf["District"]) - set(district_coordinates))
+    if unknown:
+        print(f"Warning: districts not in app/districts.py: {', '.join(unknown)}")
+    return gdf[["District", "geometry"]].dissolve(by="District").reset_index()
+
+
+def build_levels(gdf, output_dir=OUTPUT_DIR):
+    os.makedirs(output_dir, exist_ok=True)
+    for level, (tolerance, decimals) in LEVELS.items():
+        simplified = gdf.copy()
+        simplified["geometry"] = simplified.geometry.simplify(tolerance, preserve_topology=True)
+        collection = json.loads(simplified.to_json(drop_id=True))
+        for feature in collection["features"]:
+            geometry = feature["geometry"]
+            geometry["coordinates"] = round_coordinates(geometry["coordinates"], decimals)
+
+        path = level_path(level, output_dir)
+        with open(path, "w") as f:
+            json.dump(collection, f, separators=(",", ":"))
+        print(f"{level}: tolerance {tolerance} -> {os.path.getsize(path) / 1024:.0f} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("boundaries", help="district (ADM2) boundary file")
+    parser.add_argument("--name-field", default="NAME_2", help="column holding the district name")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    build_levels(load_boundaries(args.boundaries, args.name_field), args.output_dir)
+
+
+if __name__ == "__main__":
+    main()
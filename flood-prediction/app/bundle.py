@@ -0,0 +1,169 @@
+"""Single-directory model bundles: architecture, weights, scaler and schema together.
+
+    python -m app.bundle v2                # app/assets/models/v2 from the current model files
+    python -m app.bundle v2 --model path/to/flood_model.keras --scaler path/to/scaler.pkl
+
+A bundle holds manifest.json (metadata, feature schema, scaler statistics and
+the sha256 of every other file), config.json (the Keras architecture) and one
+.npy file per weight array. Loading needs neither pickle nor scikit-learn: the
+arrays are memory-mapped, checksums and schema are checked first, and the
+scaler is the two MinMaxScaler vectors. Model and scaler are written and
+verified as one unit, so a version can never pair a model with another
+model's scaler.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+from app.scoring import MODEL_PATH, SCALER_PATH, columns_to_scale
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+CONFIG_NAME = "config.json"
+
+# Model inputs after prepare_features, in order
+model_features = columns_to_scale + ['month_sin', 'month_cos']
+
+
+class BundleError(ValueError):
+    pass
+
+
+class BundleScaler:
+    """The MinMaxScaler transform from its fitted statistics"""
+
+    def __init__(self, min_, scale_, feature_names):
+        self.min_ = np.asarray(min_, dtype=float)
+        self.scale_ = np.asarray(scale_, dtype=float)
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+
+    def transform(self, frame):
+        return np.asarray(frame, dtype=float) * self.scale_ + self.min_
+
+
+def sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_bundle(path):
+    return os.path.exists(os.path.join(path, MANIFEST_NAME))
+
+
+def write_bundle(model, scaler, path, version):
+    """Write a bundle directory; it is built under a temporary name and renamed into place"""
+    if list(scaler.feature_names_in_) != columns_to_scale:
+        raise BundleError(f"Scaler was fitted on {list(scaler.feature_names_in_)}, expected {columns_to_scale}")
+    if getattr(scaler, "clip", False):
+        raise BundleError("Clipping MinMaxScalers are not supported")
+
+    # Dot-prefixed, so the registry never lists a bundle that is still being written
+    parent, name = os.path.split(os.path.abspath(path))
+    staging = os.path.join(parent, f".{name}.tmp-{os.getpid()}")
+    os.makedirs(os.path.join(staging, "weights"))
+    with open(os.path.join(staging, CONFIG_NAME), "w") as f:
+        f.write(model.to_json())
+
+    weights = []
+    for i, (variable, array) in enumerate(zip(model.weights, model.get_weights())):
+        name = os.path.join("weights", f"{i:03d}.npy")
+        np.save(os.path.join(staging, name), np.ascontiguousarray(array))
+        weights.append({"file": name, "name": variable.path, "shape": list(array.shape), "dtype": str(array.dtype)})
+
+    import keras
+
+    files = [CONFIG_NAME] + [weight["file"] for weight in weights]
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "version": version,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "keras_version": keras.__version__,
+        "schema": {
+            "input_columns": columns_to_scale + ['Month'],
+            "model_features": model_features,
+            "input_shape": [None, len(model_features), 1],
+        },
+        "scaler": {"min": scaler.min_.tolist(), "scale": scaler.scale_.tolist()},
+        "weights": weights,
+        "checksums": {name: sha256(os.path.join(staging, name)) for name in files},
+    }
+    with open(os.path.join(staging, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.rename(staging, path)
+    return manifest
+
+
+def read_manifest(path, verify=True):
+    """Parsed and validated manifest of a bundle; raises BundleError if it cannot be served"""
+    with open(os.path.join(path, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise BundleError(f"{path}: unsupported bundle format {manifest.get('format_version')}")
+    schema = manifest["schema"]
+    if schema["input_columns"] != columns_to_scale + ['Month'] or schema["model_features"] != model_features:
+        raise BundleError(f"{path}: feature schema {schema['input_columns']} does not match this code")
+    scaler = manifest["scaler"]
+    if not len(scaler["min"]) == len(scaler["scale"]) == len(columns_to_scale):
+        raise BundleError(f"{path}: scaler statistics do not match the feature schema")
+
+    if verify:
+        for name, expected in manifest["checksums"].items():
+            if sha256(os.path.join(path, name)) != expected:
+                raise BundleError(f"{path}: checksum mismatch for {name}")
+    return manifest
+
+
+def load_bundle(path, verify=True):
+    """(model, scaler, manifest) from a bundle directory"""
+    manifest = read_manifest(path, verify)
+    arrays = [np.load(os.path.join(path, weight["file"]), mmap_mode="r") for weight in manifest["weights"]]
+    for weight, array in zip(manifest["weights"], arrays):
+        if list(array.shape) != weight["shape"]:
+            raise BundleError(f"{path}: {weight['file']} has shape {array.shape}, expected {weight['shape']}")
+
+    import keras
+
+    with open(os.path.join(path, CONFIG_NAME)) as f:
+        model = keras.models.model_from_json(f.read())
+    model.set_weights(arrays)
+    scaler = BundleScaler(manifest["scaler"]["min"], manifest["scaler"]["scale"], columns_to_scale)
+    return model, scaler, manifest
+
+
+def main():
+    from app.registry import MODELS_DIR
+
+    parser = argparse.ArgumentParser(description="Write a model bundle for the registry")
+    parser.add_argument("version", help="version name, also the bundle directory name")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--scaler", default=SCALER_PATH)
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    parser.add_argument("--force", action="store_true", help="replace an existing bundle of this version")
+    args = parser.parse_args()
+
+    import joblib
+    from tensorflow.keras.models import load_model
+
+    path = os.path.join(args.models_dir, args.version)
+    if os.path.exists(path):
+        if not args.force:
+            parser.error(f"{path} already exists; pass --force to replace it")
+        shutil.rmtree(path)
+    os.makedirs(args.models_dir, exist_ok=True)
+
+    manifest = write_bundle(load_model(args.model, compile=False), joblib.load(args.scaler), path, args.version)
+    read_manifest(path)
+    print(f"Wrote {path}: {len(manifest['weights'])} weight arrays, {len(manifest['checksums'])} checksummed files")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import os
+
+import folium
+import geopandas as gpd
+import numpy as np
+import streamlit as st
+
+from app.build_districts import level_path
+
+# Map zoom below the first bound uses "low", below the second "medium", otherwise "high"
+ZOOM_LEVELS = [(9, "low"), (11, "medium")]
+
+RISK_BINS = [0.25, 0.5, 0.75]
+RISK_COLORS = np.array(["#2c7bb6", "#abd9e9", "#fdae61", "#d7191c"])
+NO_DATA_COLOR = "#cccccc"
+
+
+def level_for_zoom(zoom):
+    for max_zoom, level in ZOOM_LEVELS:
+        if zoom < max_zoom:
+            return level
+    return "high"
+
+
+@st.cache_resource
+def load_district_shapes(level):
+    path = level_path(level)
+    if not os.path.exists(path):
+        return None
+    return gpd.read_file(path)
+
+
+def choropleth_geojson(level, probabilities):
+    """GeoJSON of every district with its flood probability and fill colour, or None if not built"""
+    shapes = load_district_shapes(level)
+    if shapes is None:
+        return None
+
+    joined = shapes.merge(probabilities[["District", "Station", "Flood_Probability"]], on="District", how="left")
+    probability = joined["Flood_Probability"].to_numpy(dtype=float)
+    joined["fill"] = np.where(
+        np.isnan(probability),
+        NO_DATA_COLOR,
+        RISK_COLORS[np.digitize(np.nan_to_num(probability), RISK_BINS)],
+    )
+    joined["Flood_Probability"] = joined["Flood_Probability"].round(3)
+    return joined.to_json(drop_id=True)
+
+
+def choropleth_layer(geojson):
+    """Feature group with every district filled by its colour from choropleth_geojson"""
+    layer = folium.FeatureGroup(name="District flood risk")
+    folium.GeoJson(
+        geojson,
+        style_function=lambda feature: {
+            "fillColor": feature["properties"]["fill"],
+            "color": "#555555",
+            "weight": 0.5,
+            "fillOpacity": 0.7,
+        },
+        tooltip=folium.GeoJsonTooltip(
+            fields=["District", "Flood_Probability", "Station"],
+            aliases=["District", "Flood Risk", "Nearest Station"],
+        ),
+    ).add_to(layer)
+    return layer
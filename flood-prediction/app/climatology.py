@@ -0,0 +1,130 @@
+"""Interpolated monthly climatology for any point in Bangladesh.
+
+The station records in flood_dataset.csv are reduced to per-station monthly
+means and spread onto a regular lat/lng grid with inverse-distance weights.
+Looking up a point is then a grid index, so a complete model input row
+(climate, ALT and projected X_COR/Y_COR) costs microseconds.
+
+    python -m app.climatology   # write app/assets/climatology.npz
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from app.scoring import DATASET_PATH, columns_to_scale
+
+INDEX_PATH = "app/assets/climatology.npz"
+
+climate_features = [
+    'Max Temp', 'Min Temp', 'Rainfall', 'Relative Humidity',
+    'Wind Speed', 'Cloud Coverage', 'Bright Sunshine'
+]
+
+# Grid covering Bangladesh with a margin, in degrees
+GRID_SOUTH, GRID_NORTH = 20.5, 26.7
+GRID_WEST, GRID_EAST = 88.0, 92.75
+GRID_STEP = 0.05
+IDW_POWER = 2
+
+
+class ClimatologyIndex:
+    def __init__(self, climate, altitude, projection):
+        self.climate = climate          # (n_lat, n_lng, 12, len(climate_features))
+        self.altitude = altitude        # (n_lat, n_lng)
+        self.projection = projection    # (3, 2) affine lat/lng -> X_COR/Y_COR
+
+    def _cells(self, latitude, longitude):
+        n_lat, n_lng = self.altitude.shape
+        i = np.clip(np.rint((np.asarray(latitude, dtype=float) - GRID_SOUTH) / GRID_STEP).astype(int), 0, n_lat - 1)
+        j = np.clip(np.rint((np.asarray(longitude, dtype=float) - GRID_WEST) / GRID_STEP).astype(int), 0, n_lng - 1)
+        return i, j
+
+    def lookup_array(self, latitude, longitude, month):
+        """Model input rows as an array ordered like columns_to_scale + ['Month']"""
+        latitude, longitude, month = np.broadcast_arrays(
+            np.atleast_1d(latitude), np.atleast_1d(longitude), np.atleast_1d(month)
+        )
+        i, j = self._cells(latitude, longitude)
+        projected = np.column_stack([latitude, longitude, np.ones(len(latitude))]) @ self.projection
+        return np.column_stack([
+            self.climate[i, j, month.astype(int) - 1],
+            projected,
+            self.altitude[i, j],
+            month,
+        ])
+
+    def lookup(self, latitude, longitude, month):
+        """Model input rows (columns_to_scale + Month) as a DataFrame, for batch scoring"""
+        return pd.DataFrame(self.lookup_array(latitude, longitude, month), columns=columns_to_scale + ['Month'])
+
+    def save(self, path=INDEX_PATH):
+        np.savez_compressed(path, climate=self.climate, altitude=self.altitude, projection=self.projection)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        with np.load(path) as data:
+            return cls(data['climate'], data['altitude'], data['projection'])
+
+
+def idw_weights(grid_lat, grid_lng, station_lat, station_lng):
+    """Normalised inverse-distance weights, shape (n_grid, n_stations)"""
+    d_lat = grid_lat[:, None] - station_lat[None, :]
+    d_lng = (grid_lng[:, None] - station_lng[None, :]) * np.cos(np.radians(grid_lat))[:, None]
+    distance = np.maximum(np.hypot(d_lat, d_lng), 1e-6)
+    weights = distance ** -IDW_POWER
+    return weights / weights.sum(axis=1, keepdims=True)
+
+
+def build_index(path=DATASET_PATH):
+    df = pd.read_csv(path)
+    stations = df.groupby('Station Names').agg(
+        LATITUDE=('LATITUDE', 'first'), LONGITUDE=('LONGITUDE', 'first'),
+        X_COR=('X_COR', 'first'), Y_COR=('Y_COR', 'first'), ALT=('ALT', 'first'),
+    )
+    monthly = df.groupby(['Station Names', 'Month'])[climate_features].mean()
+    # Fill months a station never reported with its overall mean
+    monthly = monthly.unstack('Month').stack('Month', future_stack=True)
+    monthly = monthly.groupby(level=0).transform(lambda g: g.fillna(g.mean()))
+    station_climate = monthly.to_numpy().reshape(len(stations), 12, len(climate_features))
+
+    grid_lat = np.arange(GRID_SOUTH, GRID_NORTH + GRID_STEP / 2, GRID_STEP)
+    grid_lng = np.arange(GRID_WEST, GRID_EAST + GRID_STEP / 2, GRID_STEP)
+    mesh_lat, mesh_lng = (a.ravel() for a in np.meshgrid(grid_lat, grid_lng, indexing='ij'))
+    shape = (len(grid_lat), len(grid_lng))
+
+    weights = idw_weights(mesh_lat, mesh_lng, stations['LATITUDE'].to_numpy(), stations['LONGITUDE'].to_numpy())
+    climate = np.einsum('gs,smf->gmf', weights, station_climate).reshape(shape + station_climate.shape[1:])
+
+    # A few stations have no projected coordinates or altitude (stored as 0)
+    located = stations[stations['X_COR'] > 0]
+    weights = idw_weights(mesh_lat, mesh_lng, located['LATITUDE'].to_numpy(), located['LONGITUDE'].to_numpy())
+    altitude = (weights @ located['ALT'].to_numpy(dtype=float)).reshape(shape)
+
+    design = np.column_stack([located['LATITUDE'], located['LONGITUDE'], np.ones(len(located))])
+    projection = np.linalg.lstsq(design, located[['X_COR', 'Y_COR']].to_numpy(), rcond=None)[0]
+
+    return ClimatologyIndex(climate.astype(np.float32), altitude.astype(np.float32), projection)
+
+
+def load_index(path=INDEX_PATH):
+    """Load the prebuilt index, building it from the dataset if it is missing"""
+    if os.path.exists(path):
+        return ClimatologyIndex.load(path)
+    return build_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the interpolated climatology index")
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    parser.add_argument("--output", default=INDEX_PATH)
+    args = parser.parse_args()
+
+    index = build_index(args.dataset)
+    index.save(args.output)
+    print(f"Wrote {args.output}: grid {index.altitude.shape}, {os.path.getsize(args.output) / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+# District centroids. Note that X_COR holds the latitude and Y_COR the longitude.
+district_coordinates = {
+    "Bagerhat": {"X_COR": 22.651568, "Y_COR": 89.785938},
+    "Bandarban": {"X_COR": 22.195327, "Y_COR": 92.218377},
+    "Barguna": {"X_COR": 22.156889, "Y_COR": 90.329871},
+    "Barisal": {"X_COR": 22.701002, "Y_COR": 90.353451},
+    "Bhola": {"X_COR": 22.687946, "Y_COR": 90.644397},
+    "Bogra": {"X_COR": 24.846522, "Y_COR": 89.377755},
+    "Brahmanbaria": {"X_COR": 23.957090, "Y_COR": 91.111928},
+    "Chandpur": {"X_COR": 23.233258, "Y_COR": 90.671291},
+    "Chittagong": {"X_COR": 22.356851, "Y_COR": 91.783182},
+    "Chuadanga": {"X_COR": 23.640196, "Y_COR": 88.841841},
+    "Comilla": {"X_COR": 23.460856, "Y_COR": 91.180909},
+    "Cox's Bazar": {"X_COR": 21.427229, "Y_COR": 92.005806},
+    "Dhaka": {"X_COR": 23.810331, "Y_COR": 90.412521},
+    "Dinajpur": {"X_COR": 25.627858, "Y_COR": 88.633576},
+    "Faridpur": {"X_COR": 23.607082, "Y_COR": 89.842940},
+    "Feni": {"X_COR": 23.015915, "Y_COR": 91.397600},
+    "Gaibandha": {"X_COR": 25.328751, "Y_COR": 89.528088},
+    "Gazipur": {"X_COR": 23.999940, "Y_COR": 90.420273},
+    "Gopalganj": {"X_COR": 23.005085, "Y_COR": 89.826605},
+    "Habiganj": {"X_COR": 24.374945, "Y_COR": 91.415530},
+    "Jamalpur": {"X_COR": 24.937218, "Y_COR": 89.937774},
+    "Jessore": {"X_COR": 23.166667, "Y_COR": 89.208611},
+    "Jhalokathi": {"X_COR": 22.640562, "Y_COR": 90.198739},
+    "Jhenaidah": {"X_COR": 23.544817, "Y_COR": 89.153921},
+    "Joypurhat": {"X_COR": 25.102347, "Y_COR": 89.021263},
+    "Khagrachari": {"X_COR": 23.119285, "Y_COR": 91.984663},
+    "Khulna": {"X_COR": 22.845641, "Y_COR": 89.540328},
+    "Kishoreganj": {"X_COR": 24.444937, "Y_COR": 90.776575},
+    "Kurigram": {"X_COR": 25.805445, "Y_COR": 89.636174},
+    "Kushtia": {"X_COR": 23.901258, "Y_COR": 89.120482},
+    "Lakshmipur": {"X_COR": 22.942477, "Y_COR": 90.841184},
+    "Lalmonirhat": {"X_COR": 25.992346, "Y_COR": 89.284725},
+    "Madaripur": {"X_COR": 23.164102, "Y_COR": 90.189680},
+    "Magura": {"X_COR": 23.487337, "Y_COR": 89.419956},
+    "Manikganj": {"X_COR": 23.861733, "Y_COR": 90.004683},
+    "Meherpur": {"X_COR": 23.762213, "Y_COR": 88.631821},
+    "Moulvibazar": {"X_COR": 24.482934, "Y_COR": 91.777417},
+    "Munshiganj": {"X_COR": 23.542217, "Y_COR": 90.530500},
+    "Mymensingh": {"X_COR": 24.747149, "Y_COR": 90.420273},
+    "Naogaon": {"X_COR": 24.913159, "Y_COR": 88.753095},
+    "Narail": {"X_COR": 23.172534, "Y_COR": 89.512672},
+    "Narayanganj": {"X_COR": 23.623810, "Y_COR": 90.499844},
+    "Narsingdi": {"X_COR": 23.932233, "Y_COR": 90.715421},
+    "Natore": {"X_COR": 24.420556, "Y_COR": 89.000282},
+    "Netrokona": {"X_COR": 24.870955, "Y_COR": 90.727887},
+    "Nilphamari": {"X_COR": 25.931794, "Y_COR": 88.856006},
+    "Noakhali": {"X_COR": 22.869563, "Y_COR": 91.099398},
+    "Pabna": {"X_COR": 23.998542, "Y_COR": 89.233646},
+    "Panchagarh": {"X_COR": 26.341100, "Y_COR": 88.554160},
+    "Patuakhali": {"X_COR": 22.359631, "Y_COR": 90.329871},
+    "Pirojpur": {"X_COR": 22.584126, "Y_COR": 89.972030},
+    "Rajbari": {"X_COR": 23.757430, "Y_COR": 89.644466},
+    "Rajshahi": {"X_COR": 24.374945, "Y_COR": 88.604255},
+    "Rangamati": {"X_COR": 22.732374, "Y_COR": 92.198329},
+    "Rangpur": {"X_COR": 25.743892, "Y_COR": 89.275227},
+    "Satkhira": {"X_COR": 22.7185, "Y_COR": 89.0705},
+    "Chapai Nawabganj": {"X_COR": 24.6833, "Y_COR": 88.2500},
+    "Sherpur": {"X_COR": 25.0200, "Y_COR": 90.0170},
+    "Shariatpur": {"X_COR": 23.2423, "Y_COR": 90.4348},
+    "Sirajganj": {"X_COR": 24.4534, "Y_COR": 89.7007},
+    "Sunamganj": {"X_COR": 25.0658, "Y_COR": 91.3950},
+    "Sylhet": {"X_COR": 24.8949, "Y_COR": 91.8687},
+    "Tangail": {"X_COR": 24.2513, "Y_COR": 89.9167},
+    "Thakurgaon": {"X_COR": 26.0337, "Y_COR": 88.4617}
+}
+
+# Spellings used by common boundary datasets (GADM, geoBoundaries) -> names above
+district_aliases = {
+    "Barishal": "Barisal",
+    "Bogura": "Bogra",
+    "Chattogram": "Chittagong",
+    "Chapainawabganj": "Chapai Nawabganj",
+    "Nawabganj": "Chapai Nawabganj",
+    "Cox'S Bazar": "Cox's Bazar",
+    "Cumilla": "Comilla",
+    "Jashore": "Jessore",
+    "Jhalakati": "Jhalokathi",
+    "Jhalokati": "Jhalokathi",
+    "Khagrachhari": "Khagrachari",
+    "Maulvibazar": "Moulvibazar",
+    "Moulvi Bazar": "Moulvibazar",
+    "Netrakona": "Netrokona",
+}
+
+
+def district_frame():
+    """District centroids as a DataFrame with explicit LATITUDE/LONGITUDE columns"""
+    return pd.DataFrame(
+        [(name, c["X_COR"], c["Y_COR"]) for name, c in district_coordinates.items()],
+        columns=["District", "LATITUDE", "LONGITUDE"],
+    )
+
+
+def nearest(latitude, longitude, ref_latitude, ref_longitude):
+    """Index of the nearest reference point for every point"""
+    lat = np.radians(np.asarray(latitude, dtype=float))[:, None]
+    lng = np.radians(np.asarray(longitude, dtype=float))[:, None]
+    ref_lat = np.radians(np.asarray(ref_latitude, dtype=float))[None, :]
+    ref_lng = np.radians(np.asarray(ref_longitude, dtype=float))[None, :]
+    # Equirectangular distance is accurate enough at this scale
+    distance = np.hypot((ref_lng - lng) * np.cos((ref_lat + lat) / 2), ref_lat - lat)
+    return distance.argmin(axis=1)
+
+
+def district_stations(stations):
+    """District centroids with the name of their nearest station in a Station column
+
+    stations is indexed by station name and has LATITUDE/LONGITUDE columns.
+    """
+    districts = district_frame()
+    index = nearest(districts["LATITUDE"], districts["LONGITUDE"], stations["LATITUDE"], stations["LONGITUDE"])
+    districts["Station"] = stations.index.to_numpy()[index]
+    return districts
+
+
+def district_probabilities(results_df, month=None):
+    """Mean flood probability per district, taken from the nearest weather station"""
+    if month is not None:
+        results_df = results_df[results_df["Month"] == month]
+    stations = results_df.groupby("District").agg(
+        LATITUDE=("LATITUDE", "mean"),
+        LONGITUDE=("LONGITUDE", "mean"),
+        Flood_Probability=("Flood_Probability", "mean"),
+    )
+
+    districts = district_stations(stations)
+    districts["Flood_Probability"] = stations["Flood_Probability"].reindex(districts["Station"]).to_numpy()
+    return districts
@@ -0,0 +1,206 @@
+"""Streaming drift monitor for model inputs and predicted probabilities.
+
+Live requests are binned into fixed histograms per district: the 12 model
+features as prepare_features produces them, plus the output probability. Each
+district is compared with the same histograms over the training history of its
+nearest station in flood_dataset.csv. The location features (X_COR, Y_COR,
+ALT) are left out of that: they are constant in a station's history, so a
+district's interpolated values would always look shifted. They are only
+compared across all districts together. The comparison is a population
+stability index (PSI) exported as a gauge. As a rule of thumb, below 0.1 is
+stable, 0.1-0.25 is a moderate shift and above 0.25 a major one.
+
+The probability histograms depend on the model that scored the history, so a
+baseline records that model's version and is rebuilt for any other version.
+
+    python -m app.drift   # write app/assets/drift_baseline.npz
+"""
+import argparse
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from app import metrics
+from app.districts import district_frame, nearest
+from app.scoring import DATASET_PATH, load_station_records, prepare_features, columns_to_scale
+
+BASELINE_PATH = "app/assets/drift_baseline.npz"
+N_BINS = 20
+# A district's live counts are halved once it has seen this many rows, so the
+# histograms follow recent traffic in constant memory
+WINDOW = 5000
+# With fewer live rows than this the PSI is mostly noise and is not exported
+MIN_SAMPLES = 30
+# Floor for empty bins so the PSI stays finite
+EPSILON = 1e-4
+
+feature_names = columns_to_scale + ['month_sin', 'month_cos', 'Flood_Probability']
+# Constant per station, so only compared in the pooled "all" histograms
+location_features = ['X_COR', 'Y_COR', 'ALT']
+district_features = [name for name in feature_names if name not in location_features]
+
+
+def monitored_values(features, probabilities):
+    """Rows of model features plus the predicted probability, shape (n, len(feature_names))"""
+    features = np.asarray(features, dtype=float)
+    return np.column_stack([features.reshape(len(features), -1), np.asarray(probabilities, dtype=float).reshape(-1)])
+
+
+class DriftBaseline:
+    def __init__(self, stations, latitude, longitude, low, high, counts, model_version=None):
+        self.stations = stations        # (n_stations,)
+        self.latitude = latitude        # (n_stations,)
+        self.longitude = longitude      # (n_stations,)
+        self.low = low                  # (n_values,) training range of every value
+        self.high = high                # (n_values,)
+        self.counts = counts            # (n_stations, n_values, N_BINS + 2)
+        self.model_version = model_version
+
+    def bin(self, values):
+        """Histogram bin of every value, shape (n, n_values)
+
+        Bins 1..N_BINS split the training range evenly; bins 0 and N_BINS + 1
+        catch values below and above it.
+        """
+        width = np.maximum(self.high - self.low, 1e-9) / N_BINS
+        index = np.clip(np.floor((values - self.low) / width).astype(int) + 1, 0, N_BINS + 1)
+        # The training maximum belongs to the last inner bin
+        return np.where((index == N_BINS + 1) & (values <= self.high), N_BINS, index)
+
+    def save(self, path=BASELINE_PATH):
+        np.savez_compressed(
+            path, stations=self.stations, latitude=self.latitude, longitude=self.longitude,
+            low=self.low, high=self.high, counts=self.counts, model_version=np.array(self.model_version or ""),
+        )
+
+    @classmethod
+    def load(cls, path=BASELINE_PATH):
+        with np.load(path) as data:
+            arrays = [data[key] for key in ('stations', 'latitude', 'longitude', 'low', 'high', 'counts')]
+            # Baselines written before versions were recorded match no model
+            model_version = str(data['model_version']) if 'model_version' in data else None
+        return cls(*arrays, model_version=model_version or None)
+
+
+def histograms(bins, groups, n_groups):
+    """Counts per group, value and bin in one bincount, shape (n_groups, n_values, N_BINS + 2)"""
+    n_values = bins.shape[1]
+    flat = (groups[:, None] * n_values + np.arange(n_values)) * (N_BINS + 2) + bins
+    counts = np.bincount(flat.ravel(), minlength=n_groups * n_values * (N_BINS + 2))
+    return counts.reshape(n_groups, n_values, N_BINS + 2).astype(float)
+
+
+def build_baseline(model, scaler, records):
+    """Histograms of the training history per station, scored with the given model"""
+    features = prepare_features(records, scaler)
+    values = monitored_values(features, model.predict(features, verbose=0))
+    low, high = values.min(axis=0), values.max(axis=0)
+    low[-1], high[-1] = 0.0, 1.0
+
+    codes, stations = pd.factorize(records['District'])
+    location = records.groupby(codes)[['LATITUDE', 'LONGITUDE']].mean()
+    baseline = DriftBaseline(
+        stations.to_numpy(dtype=str), location['LATITUDE'].to_numpy(), location['LONGITUDE'].to_numpy(),
+        low, high, None, getattr(model, 'version', None),
+    )
+    baseline.counts = histograms(baseline.bin(values), codes, len(stations))
+    return baseline
+
+
+def load_baseline(model, scaler, path=BASELINE_PATH):
+    """Load the prebuilt baseline if this model built it, otherwise build it from the dataset with this model"""
+    if os.path.exists(path):
+        baseline = DriftBaseline.load(path)
+        if baseline.model_version == getattr(model, 'version', None):
+            return baseline
+    return build_baseline(model, scaler, load_station_records())
+
+
+def psi(live, reference):
+    """Population stability index per value, for histograms shaped (n_values, n_bins)"""
+    p = np.maximum(live / live.sum(axis=1, keepdims=True), EPSILON)
+    q = np.maximum(reference / reference.sum(axis=1, keepdims=True), EPSILON)
+    return ((p - q) * np.log(p / q)).sum(axis=1)
+
+
+class DriftMonitor:
+    def __init__(self, baseline):
+        self.baseline = baseline
+        districts = district_frame()
+        self.districts = districts['District'].to_numpy()
+        self.latitude = districts['LATITUDE'].to_numpy()
+        self.longitude = districts['LONGITUDE'].to_numpy()
+
+        # Every district is compared with its nearest station, "all" with the whole history
+        station = nearest(self.latitude, self.longitude, baseline.latitude, baseline.longitude)
+        self._reference = dict(zip(self.districts, baseline.counts[station]))
+        self._reference['all'] = baseline.counts.sum(axis=0)
+        self._live = {}
+        self._lock = threading.Lock()
+        self._district_rows = np.array([feature_names.index(name) for name in district_features])
+
+    def observe(self, features, probabilities, latitude, longitude):
+        """Add scored rows to the live histograms of their nearest districts and export the PSI
+
+        features are the (n, 12, 1) model inputs, latitude/longitude where each row was scored.
+        """
+        bins = self.baseline.bin(monitored_values(features, probabilities))
+        codes = nearest(np.atleast_1d(latitude), np.atleast_1d(longitude), self.latitude, self.longitude)
+        touched, codes = np.unique(codes, return_inverse=True)
+        counts = histograms(bins, codes.reshape(-1), len(touched))
+
+        keys = list(self.districts[touched]) + ['all']
+        with self._lock:
+            for key, added in zip(keys, list(counts) + [counts.sum(axis=0)]):
+                live = self._live.get(key)
+                live = added if live is None else live + added
+                if live[0].sum() > WINDOW:
+                    live *= 0.5
+                self._live[key] = live
+            scores = {key: self._scores(key) for key in keys}
+
+        for key, (samples, values) in scores.items():
+            metrics.set_gauge("floodguard_drift_samples", samples, district=key)
+            for feature, value in (values or {}).items():
+                metrics.set_gauge("floodguard_drift_psi", round(value, 6), district=key, feature=feature)
+
+    def _scores(self, key):
+        live = self._live.get(key)
+        if live is None:
+            return 0.0, None
+        samples = float(live[0].sum())
+        if samples < MIN_SAMPLES:
+            return samples, None
+        if key == 'all':
+            return samples, dict(zip(feature_names, psi(live, self._reference[key]).tolist()))
+        rows = self._district_rows
+        return samples, dict(zip(district_features, psi(live[rows], self._reference[key][rows]).tolist()))
+
+    def scores(self, district='all'):
+        """PSI per feature for a district (or "all"), None until it has MIN_SAMPLES rows
+
+        Districts leave out location_features.
+        """
+        with self._lock:
+            samples, values = self._scores(district)
+        return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the training baseline for the drift monitor")
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    parser.add_argument("--output", default=BASELINE_PATH)
+    args = parser.parse_args()
+
+    from app.registry import ModelRegistry
+
+    model = ModelRegistry().current
+    baseline = build_baseline(model, model.scaler, load_station_records(args.dataset))
+    baseline.save(args.output)
+    print(f"Wrote {args.output} for model version {baseline.model_version}: {len(baseline.stations)} stations, {os.path.getsize(args.output) / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
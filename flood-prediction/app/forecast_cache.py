@@ -0,0 +1,213 @@
+"""Open-Meteo forecast cache shared by every process on the host.
+
+Requests are snapped to a GRID_DEGREES cell and keyed by the cell and the
+requested variables, so nearby coordinates share one upstream call. Entries
+live in a SQLite file (FLOODGUARD_FORECAST_CACHE), which every replica on the
+host can read and write. Concurrent misses for the same key are collapsed into
+one upstream request: threads in a process wait on a shared future, and other
+processes wait on a lease row in the same database. Once an entry is older than
+FRESH_SECONDS it is still served for up to STALE_SECONDS while one caller
+refreshes it in the background.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+
+from app import metrics
+from app.sqlite_db import SQLiteDatabase
+
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+CACHE_PATH = os.environ.get(
+    "FLOODGUARD_FORECAST_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "floodguard", "forecast.sqlite"),
+)
+
+GRID_DEGREES = 0.1
+FRESH_SECONDS = 3600
+STALE_SECONDS = 6 * 3600
+RETRIES = 5
+BACKOFF_FACTOR = 0.2
+REQUEST_TIMEOUT = 10
+# Longer than fetch_forecast can take (every attempt hitting both the connect and
+# read timeout, plus the backoff), so a slow fetch is never duplicated
+LEASE_SECONDS = RETRIES * 2 * REQUEST_TIMEOUT + BACKOFF_FACTOR * 2 ** RETRIES + 10
+
+
+def snap_to_grid(latitude, longitude):
+    """Centre of the grid cell containing the coordinates"""
+    return (
+        round(round(latitude / GRID_DEGREES) * GRID_DEGREES, 4),
+        round(round(longitude / GRID_DEGREES) * GRID_DEGREES, 4),
+    )
+
+
+def cache_key(latitude, longitude, hourly, timezone):
+    cell_lat, cell_lng = snap_to_grid(latitude, longitude)
+    return f"{cell_lat:.4f}:{cell_lng:.4f}:{','.join(sorted(hourly))}:{timezone}"
+
+
+def fetch_forecast(latitude, longitude, hourly, timezone):
+    """Call Open-Meteo directly, retrying with exponential backoff"""
+    params = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "hourly": ",".join(hourly),
+        "timezone": timezone,
+    }
+    for attempt in range(RETRIES):
+        metrics.inc("floodguard_forecast_upstream_requests_total")
+        try:
+            response = requests.get(FORECAST_URL, params=params, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException:
+            metrics.inc("floodguard_forecast_upstream_errors_total")
+            if attempt == RETRIES - 1:
+                raise
+            time.sleep(BACKOFF_FACTOR * 2 ** attempt)
+
+
+class ForecastCache:
+    def __init__(self, path=CACHE_PATH, fresh_seconds=FRESH_SECONDS, stale_seconds=STALE_SECONDS):
+        self.path = path
+        self.fresh_seconds = fresh_seconds
+        self.stale_seconds = stale_seconds
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="forecast-refresh")
+
+        self._db = SQLiteDatabase(path, [
+            "CREATE TABLE IF NOT EXISTS forecasts (key TEXT PRIMARY KEY, body TEXT NOT NULL, fetched_at REAL NOT NULL)",
+            "CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)",
+        ])
+
+    def _read(self, key):
+        row = self._db.connection().execute("SELECT body, fetched_at FROM forecasts WHERE key = ?", (key,)).fetchone()
+        return (json.loads(row[0]), row[1]) if row else (None, None)
+
+    def _write(self, key, body):
+        self._db.connection().execute(
+            "INSERT OR REPLACE INTO forecasts (key, body, fetched_at) VALUES (?, ?, ?)",
+            (key, json.dumps(body), time.time()),
+        )
+
+    def _acquire_lease(self, key):
+        now = time.time()
+        with self._db.transaction() as conn:
+            row = conn.execute("SELECT owner, expires_at FROM leases WHERE key = ?", (key,)).fetchone()
+            if row and row[0] != self.owner and row[1] > now:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, self.owner, now + LEASE_SECONDS),
+            )
+            return True
+
+    def _leased_elsewhere(self, key):
+        row = self._db.connection().execute(
+            "SELECT 1 FROM leases WHERE key = ? AND owner != ? AND expires_at > ?", (key, self.owner, time.time())
+        ).fetchone()
+        return row is not None
+
+    def _release_lease(self, key):
+        self._db.connection().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.owner))
+
+    def _fetch_and_store(self, key, latitude, longitude, hourly, timezone, previous_fetched_at):
+        """Refresh one key, or wait for the process that holds its lease to do it"""
+        while True:
+            if self._acquire_lease(key):
+                try:
+                    # Another process may have stored the entry since we last read it
+                    body, fetched_at = self._read(key)
+                    if fetched_at is not None and fetched_at != previous_fetched_at:
+                        return body
+                    cell_lat, cell_lng = snap_to_grid(latitude, longitude)
+                    body = fetch_forecast(cell_lat, cell_lng, hourly, timezone)
+                    self._write(key, body)
+                    return body
+                finally:
+                    self._release_lease(key)
+
+            metrics.inc("floodguard_forecast_cache_coalesced_total", scope="process")
+            # Wait for the entry; if the lease goes away without one (the holder's fetch
+            # failed, or it died and the lease expired), try to take over
+            while self._leased_elsewhere(key):
+                time.sleep(0.1)
+                body, fetched_at = self._read(key)
+                if fetched_at is not None and fetched_at != previous_fetched_at:
+                    return body
+
+    def _load(self, key, latitude, longitude, hourly, timezone, previous_fetched_at):
+        """Run one fetch per key in this process; other threads share its result"""
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not owner:
+            metrics.inc("floodguard_forecast_cache_coalesced_total", scope="thread")
+            return future.result()
+
+        try:
+            body = self._fetch_and_store(key, latitude, longitude, hourly, timezone, previous_fetched_at)
+            future.set_result(body)
+            return body
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def _revalidate(self, key, latitude, longitude, hourly, timezone, previous_fetched_at):
+        with self._inflight_lock:
+            if key in self._inflight:
+                return
+        # An earlier queued refresh may already have replaced the entry
+        if self._read(key)[1] != previous_fetched_at:
+            return
+        try:
+            self._load(key, latitude, longitude, hourly, timezone, previous_fetched_at)
+        except Exception:
+            metrics.inc("floodguard_forecast_revalidate_errors_total")
+
+    def get(self, latitude, longitude, hourly, timezone="Asia/Dhaka"):
+        """Open-Meteo forecast JSON for the grid cell containing (latitude, longitude)"""
+        hourly = sorted(hourly)
+        key = cache_key(latitude, longitude, hourly, timezone)
+        body, fetched_at = self._read(key)
+        age = time.time() - fetched_at if fetched_at is not None else None
+
+        if age is not None and age < self.fresh_seconds:
+            metrics.inc("floodguard_forecast_cache_hits_total", state="fresh")
+            return body
+
+        if age is not None and age < self.fresh_seconds + self.stale_seconds:
+            metrics.inc("floodguard_forecast_cache_hits_total", state="stale")
+            self._refresher.submit(self._revalidate, key, latitude, longitude, hourly, timezone, fetched_at)
+            return body
+
+        metrics.inc("floodguard_forecast_cache_misses_total")
+        return self._load(key, latitude, longitude, hourly, timezone, fetched_at)
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_forecast(latitude, longitude, hourly, timezone="Asia/Dhaka"):
+    """Forecast through the process-wide cache instance"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ForecastCache()
+            metrics.start_exporter()
+    return _default_cache.get(latitude, longitude, hourly, timezone)
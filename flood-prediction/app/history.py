@@ -0,0 +1,261 @@
+"""Embedded time-series store of district risk snapshots and issued warnings.
+
+    python -m app.history outlook           # store this month's seasonal outlook for every district
+    python -m app.history latest --limit 20
+
+Both tables are keyed by (district, ts) in WITHOUT ROWID tables, so the rows
+of one district are stored in time order and range and latest-N queries are
+index seeks. The store is a SQLite file (FLOODGUARD_HISTORY) that every
+process on the host can share.
+
+Snapshots are downsampled as they age: raw for RAW_SECONDS, then hourly, then
+daily means (keeping the peak) until SNAPSHOT_RETENTION_SECONDS, after which
+they are dropped. Warnings are kept for WARNING_RETENTION_SECONDS. The
+retention pass runs on write at most once per RETENTION_INTERVAL.
+
+The outlook is the model's score of the monthly climatology, so it is the same
+for a district every time a month is scored. It is stored as one snapshot per
+district at the start of the month, replaced when rerun, and no warnings are
+issued from it.
+"""
+import argparse
+import calendar
+import os
+import threading
+import time
+
+import pandas as pd
+
+from app.sqlite_db import SQLiteDatabase
+
+HISTORY_PATH = os.environ.get(
+    "FLOODGUARD_HISTORY",
+    os.path.join(os.path.expanduser("~"), ".local", "share", "floodguard", "history.sqlite"),
+)
+
+DAY = 24 * 3600
+RAW_SECONDS = 7 * DAY
+# (age in seconds after which snapshots are merged, bucket size in seconds)
+DOWNSAMPLE_TIERS = [(RAW_SECONDS, 3600), (90 * DAY, DAY)]
+SNAPSHOT_RETENTION_SECONDS = 2 * 365 * DAY
+WARNING_RETENTION_SECONDS = 5 * 365 * DAY
+RETENTION_INTERVAL = 3600
+
+# Highest matching level wins
+WARNING_LEVELS = [(0.75, "Severe flood warning"), (0.5, "Flood warning")]
+# A district is not warned again at the same level within this window
+WARNING_COOLDOWN_SECONDS = DAY
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS snapshots (
+        district TEXT NOT NULL,
+        ts INTEGER NOT NULL,
+        probability REAL NOT NULL,
+        max_probability REAL NOT NULL,
+        samples INTEGER NOT NULL DEFAULT 1,
+        model_version TEXT,
+        PRIMARY KEY (district, ts)
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS snapshots_ts ON snapshots (ts)",
+    """CREATE TABLE IF NOT EXISTS warnings (
+        district TEXT NOT NULL,
+        ts INTEGER NOT NULL,
+        level TEXT NOT NULL,
+        probability REAL NOT NULL,
+        message TEXT NOT NULL,
+        PRIMARY KEY (district, ts)
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS warnings_ts ON warnings (ts)",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value REAL NOT NULL)",
+]
+
+
+def warning_level(probability):
+    for threshold, level in WARNING_LEVELS:
+        if probability >= threshold:
+            return level
+    return None
+
+
+class HistoryStore:
+    def __init__(self, path=HISTORY_PATH):
+        self.path = path
+        self._db = SQLiteDatabase(path, SCHEMA)
+
+    def _query(self, sql, params, columns):
+        frame = pd.DataFrame(self._db.connection().execute(sql, params).fetchall(), columns=columns)
+        frame['ts'] = pd.to_datetime(frame['ts'], unit='s')
+        return frame
+
+    def record_snapshots(self, probabilities, ts=None, model_version=None):
+        """Store one snapshot per district from a {district: probability} mapping or Series"""
+        ts = int(ts if ts is not None else time.time())
+        rows = [(district, ts, float(p), float(p), model_version) for district, p in dict(probabilities).items()]
+        self._db.connection().executemany(
+            "INSERT OR REPLACE INTO snapshots (district, ts, probability, max_probability, model_version) "
+            "VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        self.maybe_apply_retention()
+        return len(rows)
+
+    def record_warning(self, district, level, probability, message, ts=None):
+        ts = int(ts if ts is not None else time.time())
+        self._db.connection().execute(
+            "INSERT OR REPLACE INTO warnings (district, ts, level, probability, message) VALUES (?, ?, ?, ?, ?)",
+            (district, ts, level, float(probability), message),
+        )
+
+    def issue_warnings(self, probabilities, ts=None):
+        """Record a warning for every district at or above a warning level, unless it was just warned"""
+        ts = int(ts if ts is not None else time.time())
+        issued = []
+        for district, probability in dict(probabilities).items():
+            level = warning_level(probability)
+            if level is None:
+                continue
+            recent = self._db.connection().execute(
+                "SELECT 1 FROM warnings WHERE district = ? AND ts > ? AND level = ? LIMIT 1",
+                (district, ts - WARNING_COOLDOWN_SECONDS, level),
+            ).fetchone()
+            if recent:
+                continue
+            message = f"{level} for {district}: {probability:.0%} flood risk"
+            self.record_warning(district, level, probability, message, ts)
+            issued.append(message)
+        return issued
+
+    def snapshots(self, district, start=None, end=None):
+        """Snapshots of one district with start <= ts < end (unix seconds), oldest first"""
+        return self._query(
+            "SELECT ts, probability, max_probability, samples, model_version FROM snapshots "
+            "WHERE district = ? AND ts >= ? AND ts < ? ORDER BY ts",
+            (district, int(start or 0), int(end if end is not None else 2 ** 62)),
+            ['ts', 'probability', 'max_probability', 'samples', 'model_version'],
+        )
+
+    def latest_snapshots(self, district=None, limit=1):
+        """The newest `limit` snapshots of a district, or the newest snapshot of every district"""
+        if district is not None:
+            return self._query(
+                "SELECT district, ts, probability, max_probability FROM snapshots "
+                "WHERE district = ? ORDER BY ts DESC LIMIT ?",
+                (district, limit),
+                ['district', 'ts', 'probability', 'max_probability'],
+            )
+        # Hop from district to district along the primary key, then seek each one's newest row,
+        # instead of scanning the whole table the way GROUP BY would
+        return self._query(
+            """WITH RECURSIVE districts(name) AS (
+                SELECT min(district) FROM snapshots
+                UNION ALL
+                SELECT (SELECT min(district) FROM snapshots WHERE district > name) FROM districts WHERE name IS NOT NULL
+            )
+            SELECT s.district, s.ts, s.probability, s.max_probability
+            FROM districts JOIN snapshots s ON s.district = districts.name
+            AND s.ts = (SELECT max(ts) FROM snapshots WHERE district = districts.name)""",
+            (),
+            ['district', 'ts', 'probability', 'max_probability'],
+        )
+
+    def latest_warnings(self, limit=10, district=None):
+        """The newest warnings, across all districts or for one"""
+        if district is not None:
+            sql, params = "SELECT district, ts, level, probability, message FROM warnings WHERE district = ? ORDER BY ts DESC LIMIT ?", (district, limit)
+        else:
+            sql, params = "SELECT district, ts, level, probability, message FROM warnings ORDER BY ts DESC LIMIT ?", (limit,)
+        return self._query(sql, params, ['district', 'ts', 'level', 'probability', 'message'])
+
+    def maybe_apply_retention(self, now=None):
+        """Run apply_retention if no process has done so within RETENTION_INTERVAL"""
+        now = now if now is not None else time.time()
+        with self._db.transaction() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'retention_at'").fetchone()
+            due = row is None or now - row[0] >= RETENTION_INTERVAL
+            if due:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('retention_at', ?)", (now,))
+        if due:
+            self.apply_retention(now)
+        return due
+
+    def apply_retention(self, now=None):
+        """Merge aged snapshots into coarser buckets and drop rows past their retention"""
+        now = int(now if now is not None else time.time())
+        with self._db.transaction() as conn:
+            tier_ends = [age for age, _ in DOWNSAMPLE_TIERS[1:]] + [SNAPSHOT_RETENTION_SECONDS]
+            for (age, bucket), end_age in zip(DOWNSAMPLE_TIERS, tier_ends):
+                low, high = now - end_age, now - age
+                # Merged rows land on bucket starts, so a second pass leaves them unchanged
+                merged = conn.execute(
+                    "SELECT district, (ts / ?) * ?, sum(probability * samples) / sum(samples), "
+                    "max(max_probability), sum(samples), max(model_version) "
+                    "FROM snapshots WHERE ts >= ? AND ts < ? GROUP BY district, ts / ?",
+                    (bucket, bucket, low, high, bucket),
+                ).fetchall()
+                conn.execute("DELETE FROM snapshots WHERE ts >= ? AND ts < ?", (low, high))
+                conn.executemany(
+                    "INSERT OR REPLACE INTO snapshots (district, ts, probability, max_probability, samples, model_version) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    merged,
+                )
+            conn.execute("DELETE FROM snapshots WHERE ts < ?", (now - SNAPSHOT_RETENTION_SECONDS,))
+            conn.execute("DELETE FROM warnings WHERE ts < ?", (now - WARNING_RETENTION_SECONDS,))
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def default_store():
+    """The process-wide store at HISTORY_PATH"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = HistoryStore()
+    return _default_store
+
+
+def month_start(month=None, year=None):
+    """Unix time of midnight UTC on the first of a month, by default the current one"""
+    today = time.gmtime()
+    return calendar.timegm((year or today.tm_year, month or today.tm_mon, 1, 0, 0, 0))
+
+
+def record_seasonal_outlook(store, month=None):
+    """Score every district with a month's climatology and store it as that month's outlook"""
+    from app.climatology import load_index
+    from app.districts import district_frame
+    from app.registry import ModelRegistry
+    from app.scoring import score_points
+
+    model = ModelRegistry().current
+    ts = month_start(month)
+    points = district_frame()
+    points['Month'] = time.gmtime(ts).tm_mon
+    scored = score_points(model, model.scaler, load_index(), points)
+    probabilities = dict(zip(scored['District'], scored['Flood_Probability']))
+    store.record_snapshots(probabilities, ts, model.version)
+    return probabilities, ts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and query the risk history")
+    parser.add_argument("--path", default=HISTORY_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    outlook = commands.add_parser("outlook", help="score every district with the climatology and store the month's outlook")
+    outlook.add_argument("--month", type=int, help="month to score (default: the current month)")
+    latest = commands.add_parser("latest", help="print the newest warnings")
+    latest.add_argument("--limit", type=int, default=10)
+    latest.add_argument("--district")
+    args = parser.parse_args()
+
+    store = HistoryStore(args.path)
+    if args.command == "outlook":
+        probabilities, ts = record_seasonal_outlook(store, args.month)
+        print(f"Recorded the {time.strftime('%B %Y', time.gmtime(ts))} seasonal outlook for {len(probabilities)} districts")
+    else:
+        print(store.latest_warnings(args.limit, args.district).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import json
+import os
+
+import streamlit as st
+
+from app.build_assets import ASSETS_DIR, VARIANTS_DIR, MANIFEST_NAME
+
+
+@st.cache_resource
+def load_variant_manifest():
+    manifest_path = os.path.join(VARIANTS_DIR, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def image_variant_path(source_name, width):
+    """Smallest file, in bytes, that is at least `width` pixels wide: a generated variant or the original asset"""
+    original = os.path.join(ASSETS_DIR, source_name)
+    entry = load_variant_manifest().get(source_name)
+    if not entry:
+        return original
+
+    # Nothing is wider than the original, which is always a candidate
+    width = min(width, entry.get("width", width))
+    candidates = [(v["bytes"], os.path.join(VARIANTS_DIR, v["file"])) for v in entry["variants"] if v["width"] >= width]
+    candidates.append((entry["bytes"], original))
+    return min(candidates)[1]
+
+
+@st.cache_data(show_spinner=False)
+def load_image(source_name, width=640):
+    """Encoded image bytes, read once per process and served without re-encoding"""
+    with open(image_variant_path(source_name, width), "rb") as f:
+        return f.read()
@@ -1,19 +1,34 @@
 
+import os
+import sys
 import requests
 from datetime import datetime, timedelta
 import streamlit as st
-from PIL import Image
-import joblib
 import pandas as pd
 import numpy as np
 import folium
-from folium.plugins import MarkerCluster
+import plotly.express as px
 from streamlit_folium import folium_static
 import keras
-from tensorflow.keras.models import load_model
 import branca.colormap
 from functools import lru_cache
 
+# Make the `app` package importable when launched with `streamlit run app/main.py`.
+# The script re-runs on every interaction, so only add the path once.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app.scoring import columns_to_scale, prepare_features, load_station_records, score_station_records, score_sweep, attribution_frame
+from app.images import load_image
+from app.districts import district_coordinates, district_probabilities
+from app.choropleth import choropleth_geojson, choropleth_layer, level_for_zoom
+from app.viewport import PredictionIndex, marker_layer, snap_view
+from app.climatology import load_index
+from app.registry import ModelRegistry
+from app.drift import DriftMonitor, load_baseline
+from app.history import HistoryStore
+from app import metrics
 
 # Set page configuration
 st.set_page_config(
@@ -79,18 +94,55 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-# Load model and scaler
+# One registry per process: every page scores with the same warmed-up model,
+# and new versions are hot-swapped in the background
 @st.cache_resource
-def load_trained_model():
-    return load_model("app/assets/flood_model.keras")
+def load_model_registry():
+    registry = ModelRegistry()
+    registry.on_swap(clear_version_caches)
+    registry.start()
+    return registry
+
+def clear_version_caches(version):
+    # Everything below is keyed by model version; drop the previous version's
+    # tables, indexes and layers instead of keeping them for the life of the process
+    for cached in (load_flood_predictions, load_prediction_index, load_view_markers,
+                   load_district_probabilities, load_district_geojson, load_drift_monitor):
+        cached.clear()
+
+registry = load_model_registry()
+
+# Scoring the full station history is the most expensive step in the app,
+# so it runs once per process and model version and is shared by every session.
+# Arguments starting with an underscore are not part of the cache key.
+@st.cache_data(show_spinner="Scoring historical station records...")
+def load_flood_predictions(model_version, _model):
+    return score_station_records(_model, _model.scaler, load_station_records())
 
 @st.cache_resource
-def load_scaler():
-    return joblib.load("app/assets/scaler.pkl")
+def load_climatology():
+    return load_index()
 
-# Load model and scaler once
-model = load_trained_model()
-scaler = load_scaler()
+@st.cache_resource
+def load_history():
+    return HistoryStore()
+
+@st.cache_resource
+def load_drift_monitor(model_version, _model):
+    # One monitor per process and model version, so its histograms cover every
+    # session and the probabilities are compared with the same model's baseline
+    metrics.start_exporter()
+    return DriftMonitor(load_baseline(_model, _model.scaler))
+
+@st.cache_resource
+def load_prediction_index(model_version, _model):
+    return PredictionIndex(load_flood_predictions(model_version, _model))
+
+# Markers per snapped viewport; bounded so panning around cannot grow the cache forever.
+# The folium layer is built per run, since st_folium modifies the layer it is given.
+@st.cache_data(max_entries=256)
+def load_view_markers(model_version, _model, view, month):
+    return load_prediction_index(model_version, _model).markers(view, month)
 
 
 def validate_coordinates(lat, lng):
@@ -107,69 +159,6 @@ def validate_coordinates(lat, lng):
         st.error("Coordinates must be numeric values")
         return False
 
-district_coordinates = {
-    "Bagerhat": {"X_COR": 22.651568, "Y_COR": 89.785938},
-    "Bandarban": {"X_COR": 22.195327, "Y_COR": 92.218377},
-    "Barguna": {"X_COR": 22.156889, "Y_COR": 90.329871},
-    "Barisal": {"X_COR": 22.701002, "Y_COR": 90.353451},
-    "Bhola": {"X_COR": 22.687946, "Y_COR": 90.644397},
-    "Bogra": {"X_COR": 24.846522, "Y_COR": 89.377755},
-    "Brahmanbaria": {"X_COR": 23.957090, "Y_COR": 91.111928},
-    "Chandpur": {"X_COR": 23.233258, "Y_COR": 90.671291},
-    "Chittagong": {"X_COR": 22.356851, "Y_COR": 91.783182},
-    "Chuadanga": {"X_COR": 23.640196, "Y_COR": 88.841841},
-    "Comilla": {"X_COR": 23.460856, "Y_COR": 91.180909},
-    "Cox's Bazar": {"X_COR": 21.427229, "Y_COR": 92.005806},
-    "Dhaka": {"X_COR": 23.810331, "Y_COR": 90.412521},
-    "Dinajpur": {"X_COR": 25.627858, "Y_COR": 88.633576},
-    "Faridpur": {"X_COR": 23.607082, "Y_COR": 89.842940},
-    "Feni": {"X_COR": 23.015915, "Y_COR": 91.397600},
-    "Gaibandha": {"X_COR": 25.328751, "Y_COR": 89.528088},
-    "Gazipur": {"X_COR": 23.999940, "Y_COR": 90.420273},
-    "Gopalganj": {"X_COR": 23.005085, "Y_COR": 89.826605},
-    "Habiganj": {"X_COR": 24.374945, "Y_COR": 91.415530},
-    "Jamalpur": {"X_COR": 24.937218, "Y_COR": 89.937774},
-    "Jessore": {"X_COR": 23.166667, "Y_COR": 89.208611},
-    "Jhalokathi": {"X_COR": 22.640562, "Y_COR": 90.198739},
-    "Jhenaidah": {"X_COR": 23.544817, "Y_COR": 89.153921},
-    "Joypurhat": {"X_COR": 25.102347, "Y_COR": 89.021263},
-    "Khagrachari": {"X_COR": 23.119285, "Y_COR": 91.984663},
-    "Khulna": {"X_COR": 22.845641, "Y_COR": 89.540328},
-    "Kishoreganj": {"X_COR": 24.444937, "Y_COR": 90.776575},
-    "Kurigram": {"X_COR": 25.805445, "Y_COR": 89.636174},
-    "Kushtia": {"X_COR": 23.901258, "Y_COR": 89.120482},
-    "Lakshmipur": {"X_COR": 22.942477, "Y_COR": 90.841184},
-    "Lalmonirhat": {"X_COR": 25.992346, "Y_COR": 89.284725},
-    "Madaripur": {"X_COR": 23.164102, "Y_COR": 90.189680},
-    "Magura": {"X_COR": 23.487337, "Y_COR": 89.419956},
-    "Manikganj": {"X_COR": 23.861733, "Y_COR": 90.004683},
-    "Meherpur": {"X_COR": 23.762213, "Y_COR": 88.631821},
-    "Moulvibazar": {"X_COR": 24.482934, "Y_COR": 91.777417},
-    "Munshiganj": {"X_COR": 23.542217, "Y_COR": 90.530500},
-    "Mymensingh": {"X_COR": 24.747149, "Y_COR": 90.420273},
-    "Naogaon": {"X_COR": 24.913159, "Y_COR": 88.753095},
-    "Narail": {"X_COR": 23.172534, "Y_COR": 89.512672},
-    "Narayanganj": {"X_COR": 23.623810, "Y_COR": 90.499844},
-    "Narsingdi": {"X_COR": 23.932233, "Y_COR": 90.715421},
-    "Natore": {"X_COR": 24.420556, "Y_COR": 89.000282},
-    "Netrokona": {"X_COR": 24.870955, "Y_COR": 90.727887},
-    "Nilphamari": {"X_COR": 25.931794, "Y_COR": 88.856006},
-    "Noakhali": {"X_COR": 22.869563, "Y_COR": 91.099398},
-    "Pabna": {"X_COR": 23.998542, "Y_COR": 89.233646},
-    "Panchagarh": {"X_COR": 26.341100, "Y_COR": 88.554160},
-    "Patuakhali": {"X_COR": 22.359631, "Y_COR": 90.329871},
-    "Pirojpur": {"X_COR": 22.584126, "Y_COR": 89.972030},
-    "Rajbari": {"X_COR": 23.757430, "Y_COR": 89.644466},
-    "Rajshahi": {"X_COR": 24.374945, "Y_COR": 88.604255},
-    "Rangamati": {"X_COR": 22.732374, "Y_COR": 92.198329},
-    "Rangpur": {"X_COR": 25.743892, "Y_COR": 89.275227},
-    "Satkhira": {"X_COR": 22.7185, "Y_COR": 89.0705},
-    "Chapai Nawabganj": {"X_COR": 24.6833, "Y_COR": 88.2500},
-    "Sherpur": {"X_COR": 25.0200, "Y_COR": 90.0170},
-    "Shariatpur": {"X_COR": 23.2423, "Y_COR": 90.4348}
-}
- 
-
 
 def search_now_page():
     st.markdown("""
@@ -219,67 +208,83 @@ color: #2c3e50;  /* Dark text color for contrast */
     """, unsafe_allow_html=True)
 
     st.markdown('<div class="prediction-header"><h1>🌦️ Flood Risk Prediction Analysis</h1></div>', unsafe_allow_html=True)
+    prediction_form()
+
+
+# Widget changes only rerun the form, not the page routing and CSS around it
+@st.fragment
+def prediction_form():
     with st.container():
         col1, col2 = st.columns(2)
 
         with col1:
             district = st.selectbox("Select District", list(district_coordinates.keys()))
+            month = st.number_input("Month (1-12)", min_value=1, max_value=12, value=6)
+
+            # Pre-fill the inputs with the interpolated climatology for this district and month;
+            # the widgets reset whenever the district or month changes
+            latitude = district_coordinates[district]["X_COR"]
+            longitude = district_coordinates[district]["Y_COR"]
+            climate = dict(zip(columns_to_scale, load_climatology().lookup_array(latitude, longitude, month)[0]))
+
+            def typical(column, min_value, max_value):
+                return float(round(min(max(climate[column], min_value), max_value), 1))
 
-            max_temp = st.number_input("Max Temperature (°C)", min_value=0.0, max_value=50.0, value=25.0)
-            min_temp = st.number_input("Min Temperature (°C)", min_value=0.0, max_value=50.0, value=15.0)
-            rainfall = st.number_input("Rainfall (mm)", min_value=0.0, max_value=500.0, value=50.0)
-            relative_humidity = st.number_input("Relative Humidity (%)", min_value=0.0, max_value=100.0, value=60.0)
-            wind_speed = st.number_input("Wind Speed (km/h)", min_value=0.0, max_value=100.0, value=10.0)
+            max_temp = st.number_input("Max Temperature (°C)", min_value=0.0, max_value=50.0, value=typical('Max Temp', 0.0, 50.0))
+            min_temp = st.number_input("Min Temperature (°C)", min_value=0.0, max_value=50.0, value=typical('Min Temp', 0.0, 50.0))
+            rainfall = st.number_input("Rainfall (mm)", min_value=0.0, max_value=2500.0, value=typical('Rainfall', 0.0, 2500.0))
+            relative_humidity = st.number_input("Relative Humidity (%)", min_value=0.0, max_value=100.0, value=typical('Relative Humidity', 0.0, 100.0))
+            wind_speed = st.number_input("Wind Speed (km/h)", min_value=0.0, max_value=100.0, value=typical('Wind Speed', 0.0, 100.0))
 
         with col2:
-            cloud_coverage = st.number_input("Cloud Coverage (%)", min_value=0.0, max_value=100.0, value=30.0)
-            bright_sunshine = st.number_input("Bright Sunshine (hours)", min_value=0.0, max_value=24.0, value=6.0)
-            alt = st.number_input("Altitude (m)", min_value=0.0, max_value=5000.0, value=100.0)
+            cloud_coverage = st.number_input("Cloud Coverage (%)", min_value=0.0, max_value=100.0, value=typical('Cloud Coverage', 0.0, 100.0))
+            bright_sunshine = st.number_input("Bright Sunshine (hours)", min_value=0.0, max_value=24.0, value=typical('Bright Sunshine', 0.0, 24.0))
+            alt = st.number_input("Altitude (m)", min_value=0.0, max_value=5000.0, value=typical('ALT', 0.0, 5000.0))
 
-            x_cor = district_coordinates[district]["X_COR"]
-            y_cor = district_coordinates[district]["Y_COR"]
+            # The model was trained on the dataset's projected station coordinates
+            x_cor = climate['X_COR']
+            y_cor = climate['Y_COR']
 
             st.write(f"**📍 Coordinates for {district}:**")
-            st.write(f"X: {x_cor}, Y: {y_cor}")
-
-        month = st.number_input("Month (1-12)", min_value=1, max_value=12, value=6)     
+            st.write(f"Lat: {latitude}, Lng: {longitude}")
 
     if st.button("🌧️ Predict Flood Risk", key="predict_button"):
-        columns_to_scale = [
-            'Max Temp', 'Min Temp', 'Rainfall', 'Relative Humidity',
-            'Wind Speed', 'Cloud Coverage', 'Bright Sunshine', 
-            'X_COR', 'Y_COR', 'ALT'
-        ]
         input_data = pd.DataFrame([[
             max_temp, min_temp, rainfall, relative_humidity,
             wind_speed, cloud_coverage, bright_sunshine,
-            x_cor, y_cor, alt
-        ]], columns=columns_to_scale)
-        
-        scaled_features = scaler.transform(input_data)
-        
-        month_sin = np.sin(2 * np.pi * month / 12)
-        month_cos = np.cos(2 * np.pi * month / 12)
-
-        processed_features = np.concatenate([
-            scaled_features,
-            np.array([[month_sin, month_cos]])
-        ], axis=1)
-        
-        input_array = processed_features.reshape(1, processed_features.shape[1], 1)
-        
-        probability = model.predict(input_array)[0][0]
+            x_cor, y_cor, alt, month
+        ]], columns=columns_to_scale + ['Month'])
+
+        current = registry.current
+        input_array = prepare_features(input_data, current.scaler)
+
+        # The explanation comes out of the same batched pass as the probability
+        probabilities, attributions = current.predict_with_attributions(input_array)
+        probability = probabilities[0][0]
+        load_drift_monitor(current.version, current).observe(input_array, [probability], latitude, longitude)
         risk_level = "High Risk" if probability >= 0.5 else "Low Risk"
-        
-        st.markdown(f'''
-            <div class="result-card">
-                <h3>Prediction Result</h3>
-                <p style="font-size:1.4rem; color: {'#c0392b' if risk_level == 'High Risk' else '#27ae60'}">
-                    {risk_level} ({probability:.2%} probability)
-                </p>
-                <small>Always stay prepared and follow local authority guidelines!!</small>
-            </div>
-        ''', unsafe_allow_html=True)
+
+        result_col, explain_col = st.columns(2)
+        with result_col:
+            st.markdown(f'''
+                <div class="result-card">
+                    <h3>Prediction Result</h3>
+                    <p style="font-size:1.4rem; color: {'#c0392b' if risk_level == 'High Risk' else '#27ae60'}">
+                        {risk_level} ({probability:.2%} probability)
+                    </p>
+                    <small>Always stay prepared and follow local authority guidelines!!</small>
+                </div>
+            ''', unsafe_allow_html=True)
+        with explain_col:
+            st.plotly_chart(attribution_chart(attribution_frame(attributions).iloc[0]), use_container_width=True)
+
+    base_row = dict(zip(columns_to_scale + ['Month'], [
+        max_temp, min_temp, rainfall, relative_humidity,
+        wind_speed, cloud_coverage, bright_sunshine,
+        x_cor, y_cor, alt, month
+    ]))
+    if st.toggle("🔬 What-if sweep", key="sweep_toggle"):
+        what_if_sweep(base_row)
 
     # if st.button("🔄 Fetch Current Weather Conditions"):
     #     try:
@@ -310,54 +315,157 @@ color: #2c3e50;  /* Dark text color for contrast */
 
 
 
+# Inputs the sweep can vary, with the same bounds as the form
+sweep_bounds = {
+    'Rainfall': ("Rainfall (mm)", 0.0, 2500.0),
+    'Relative Humidity': ("Relative Humidity (%)", 0.0, 100.0),
+    'Max Temp': ("Max Temperature (°C)", 0.0, 50.0),
+    'Min Temp': ("Min Temperature (°C)", 0.0, 50.0),
+    'Wind Speed': ("Wind Speed (km/h)", 0.0, 100.0),
+    'Cloud Coverage': ("Cloud Coverage (%)", 0.0, 100.0),
+    'Bright Sunshine': ("Bright Sunshine (hours)", 0.0, 24.0),
+    'ALT': ("Altitude (m)", 0.0, 5000.0),
+}
+
+
+def attribution_chart(attribution):
+    """Signed share of each input in a prediction, from one row of attribution_frame"""
+    # Both projected coordinates describe the location
+    attribution = attribution.rename(lambda column: "Location" if column in ('X_COR', 'Y_COR') else column)
+    attribution = attribution.groupby(level=0).sum()
+    share = attribution / max(attribution.abs().sum(), 1e-12)
+    share = share.reindex(share.abs().sort_values().index)
+
+    labels = [sweep_bounds[column][0] if column in sweep_bounds else column for column in share.index]
+    fig = px.bar(
+        x=share.to_numpy(), y=labels, orientation='h',
+        color=np.where(share.to_numpy() >= 0, "raises risk", "lowers risk"),
+        color_discrete_map={"raises risk": "#c0392b", "lowers risk": "#27ae60"},
+        labels={'x': "Share of influence", 'y': "", 'color': ""},
+        title="What drove this prediction",
+    )
+    fig.update_xaxes(tickformat=".0%")
+    fig.update_layout(height=360, margin=dict(l=0, r=0, t=40, b=0))
+    return fig
+
+
+def what_if_sweep(base_row):
+    """Vary one or two inputs over a grid around the form values and plot the predicted risk"""
+    swept = st.multiselect(
+        "Inputs to vary (one or two)",
+        list(sweep_bounds),
+        default=['Rainfall', 'Relative Humidity'],
+        max_selections=2,
+        format_func=lambda column: sweep_bounds[column][0],
+        key="sweep_columns",
+    )
+    if not swept:
+        st.info("Pick at least one input to vary.")
+        return
+
+    points = st.slider("Points per input", min_value=10, max_value=200 if len(swept) == 1 else 60, value=32, key="sweep_points")
+    axes = {}
+    for column in swept:
+        label, min_value, max_value = sweep_bounds[column]
+        low, high = st.slider(label, min_value=min_value, max_value=max_value, value=(min_value, max_value), key=f"sweep_range_{column}")
+        axes[column] = np.linspace(low, high, points)
+
+    # The whole grid goes through the graph as one batch
+    current = registry.current
+    results = score_sweep(current, current.scaler, base_row, axes)
+
+    if len(swept) == 1:
+        column = swept[0]
+        fig = px.line(results, x=column, y='Flood_Probability', labels={column: sweep_bounds[column][0], 'Flood_Probability': "Flood Risk"})
+        fig.add_vline(x=base_row[column], line_dash="dash", annotation_text="current input")
+        fig.update_yaxes(tickformat=".0%", range=[0, 1])
+    else:
+        x_column, y_column = swept[1], swept[0]
+        risk = results['Flood_Probability'].to_numpy().reshape(points, points)
+        fig = px.imshow(
+            risk, x=axes[x_column], y=axes[y_column], origin='lower', aspect='auto',
+            zmin=0, zmax=1, color_continuous_scale='RdYlBu_r',
+            labels={'x': sweep_bounds[x_column][0], 'y': sweep_bounds[y_column][0], 'color': "Flood Risk"},
+        )
+        fig.add_scatter(x=[base_row[x_column]], y=[base_row[y_column]], mode='markers', marker=dict(color='black', size=10), name="current input")
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"{len(results)} scenarios scored with model version {current.version}")
+
+
 from streamlit_folium import st_folium  
 
 def flood_prone_areas_page():
     st.title("Flood-Prone Areas")
     st.write("Explore the regions in Bangladesh that are most vulnerable to flooding.")
-    
-    df = pd.read_csv("app/assets/flood_dataset.csv")
-    
-    new_df = df.drop(['A', 'Period', 'LATITUDE', 'LONGITUDE', 'Station Number'], axis=1)
-    new_df.rename(columns={'Station Names': 'District'}, inplace=True)
-    Train_df = new_df[~new_df['District'].isin(['Ishurdi', 'Maijdee Court'])].copy()
-    original_coords = Train_df[['X_COR', 'Y_COR']].copy()  
-    Train_df.drop(['District', 'YEAR'], axis=1, inplace=True)
-
-    scaler = joblib.load("app/assets/scaler.pkl")
-    columns_to_scale = ['Max Temp', 'Min Temp', 'Rainfall', 'Relative Humidity',
-                        'Wind Speed', 'Cloud Coverage', 'Bright Sunshine', 'X_COR', 'Y_COR', 'ALT']
-    Train_df[columns_to_scale] = scaler.transform(Train_df[columns_to_scale])
-    
-    Train_df['month_sin'] = np.sin(2 * np.pi * Train_df['Month'] / 12)
-    Train_df['month_cos'] = np.cos(2 * np.pi * Train_df['Month'] / 12)
-    Train_df.drop('Month', axis=1, inplace=True)
-    
-    features = np.array(Train_df)
-    features_reshaped = features.reshape(features.shape[0], features.shape[1], 1)
-    
-    model = load_model("app/assets/flood_model.keras")
-    predictions = model.predict(features_reshaped).flatten() 
+    flood_map_view()
+
+
+def build_base_map():
+    # Not cached: st_folium adds feature_group_to_add to the map object it is given
+    return folium.Map(location=[23.6850, 90.3563], zoom_start=7)
+
+@st.cache_data
+def load_district_probabilities(model_version, _model, month):
+    return district_probabilities(load_flood_predictions(model_version, _model), month)
+
+# Only the GeoJSON is shared between sessions. st_folium reassigns the id of the
+# layer it is given and adds it to that session's map, so layers are built per run.
+@st.cache_data
+def load_district_geojson(model_version, _model, level, month):
+    return choropleth_geojson(level, load_district_probabilities(model_version, _model, month))
+
+
+@st.fragment
+def flood_map_view():
+    current = registry.current
+    mode = st.radio("Map mode", ["Station markers", "District choropleth"], horizontal=True)
+    month = st.selectbox("Month", [None] + list(range(1, 13)), format_func=lambda m: "All months" if m is None else str(m))
+    if mode == "Station markers":
+        station_marker_map(current, month)
+        return
+
+    zoom = st.session_state.get("district_map_zoom", 7)
+    level = level_for_zoom(zoom)
+    geojson = load_district_geojson(current.version, current, level, month)
+    if geojson is None:
+        st.info("District boundaries have not been built yet. Run `python -m app.build_districts` first.")
+        return
+
+    # Only the district layer is swapped when the zoom crosses a simplification level
+    state = st_folium(
+        build_base_map(), key="district_map", feature_group_to_add=choropleth_layer(geojson),
+        zoom=zoom, width=1000, height=500, returned_objects=["zoom"],
+    )
+    if state and state.get("zoom"):
+        st.session_state.district_map_zoom = state["zoom"]
+        if level_for_zoom(state["zoom"]) != level:
+            st.rerun(scope="fragment")
 
-    results_df = original_coords.copy()
-    results_df['Flood_Probability'] = predictions
-    
-    m = folium.Map(location=[23.6850, 90.3563], zoom_start=7)
-    marker_cluster = MarkerCluster().add_to(m)
-    
 
-    for idx, row in results_df.iterrows():
-        folium.CircleMarker(
-            location=[row['Y_COR'], row['X_COR']], 
-            radius=5,
-            color='red' if row['Flood_Probability'] >= 0.5 else 'blue', 
-            fill=True,
-            fill_opacity=0.7,
-            popup=f"Flood Risk: {row['Flood_Probability']:.2f}"
-        ).add_to(marker_cluster)
-    
-    st_folium(m, width=1000, height=500)
- 
+# Bangladesh, as the map first opens
+INITIAL_VIEW = snap_view(20.5, 88.0, 26.7, 92.75, 7)
+
+
+def station_marker_map(current, month):
+    """Markers for the current viewport only, aggregated when zoomed out"""
+    view = st.session_state.get("marker_map_view", INITIAL_VIEW)
+    layer = marker_layer(load_view_markers(current.version, current, view, month))
+
+    # The base map is sent once; pans and zooms only swap the marker layer
+    state = st_folium(
+        build_base_map(), key="marker_map", feature_group_to_add=layer,
+        zoom=view[4], width=1000, height=500, returned_objects=["bounds", "zoom"],
+    )
+    bounds = (state or {}).get("bounds") or {}
+    if bounds.get("_southWest", {}).get("lat") is not None and state.get("zoom"):
+        new_view = snap_view(
+            bounds["_southWest"]["lat"], bounds["_southWest"]["lng"],
+            bounds["_northEast"]["lat"], bounds["_northEast"]["lng"], state["zoom"],
+        )
+        if new_view != view:
+            st.session_state.marker_map_view = new_view
+            st.rerun(scope="fragment")
+
 
 def notifications_page():
    
@@ -421,7 +529,18 @@ def notifications_page():
     """, unsafe_allow_html=True)
 
     st.markdown('<div class="notifications-header"><h1>🌊 Flood Alert Notifications</h1></div>', unsafe_allow_html=True)
-    
+    subscribe_form()
+
+    st.subheader("📢 Recent Flood Warnings")
+    warnings = load_history().latest_warnings(10)
+    if warnings.empty:
+        st.info("No flood warnings have been issued yet.")
+    for warning in warnings.itertuples(index=False):
+        st.markdown(f'<div class="warning-card">{warning.message} ({warning.ts:%Y-%m-%d %H:%M})</div>', unsafe_allow_html=True)
+
+
+@st.fragment
+def subscribe_form():
     with st.container():
         # st.markdown('<div class="subscribe-form">', unsafe_allow_html=True)
         email = st.text_input("Enter your email to receive alerts:", key="email_input")
@@ -432,15 +551,6 @@ def notifications_page():
                 st.success(f"Thank you for subscribing! Alerts will be sent to {email}.")
         st.markdown('</div>', unsafe_allow_html=True)
 
-    st.subheader("📢 Recent Flood Warnings")
-    warnings = [
-        "Flood warning issued for Dhaka on 2023-10-15.",
-        "Moderate flood risk in Sylhet on 2023-10-14.",
-        "No active warnings for Chittagong.",
-    ]
-    for warning in warnings:
-        st.markdown(f'<div class="warning-card">{warning}</div>', unsafe_allow_html=True)
-    
 #    # Modified alert section
 #     st.subheader(f"Recent Flood Warnings ({current_time})")
     
@@ -508,18 +618,18 @@ def home_page():
     st.write("")  
     st.write("")
     # Display flood image
-    image1_path = "app/assets/flood_image.jpeg"  # Update this path
-    image2_path = "app/assets/11.jpg"  # Update this path
+    image1_name = "flood_image.jpeg"
+    image2_name = "11.jpg"
     try:
-        header_image1 = Image.open(image1_path)
-        header_image2 = Image.open(image2_path)
+        header_image1 = load_image(image1_name, width=640)
+        header_image2 = load_image(image2_name, width=640)
         col1, col2 = st.columns([1,1])  # Adjust column ratios as needed
         with col1:
             st.image(header_image1, caption='Aerial View of a Flooded Region', use_container_width=True)
         with col2:
             st.image(header_image2, caption='Flooded Agricultural Land Devastating Crops',use_container_width=True)
-    except FileNotFoundError:
-        st.error(f"Header image not found at {header_image_path}")
+    except FileNotFoundError as e:
+        st.error(f"Header image not found at {e.filename}")
 
     # Add a Feature Highlights Section
     st.markdown(
@@ -609,7 +719,7 @@ def home_page():
         ''',
         unsafe_allow_html=True,
     )
-    st.image("app/assets/how_it_works.jpeg", caption="Flood Prediction Workflow", use_container_width=True)
+    st.image(load_image("how_it_works.jpeg", width=1280), caption="Flood Prediction Workflow", use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
     # FAQs section
     st.subheader("FAQs")
@@ -0,0 +1,192 @@
+"""Memory-leak regression harness for long-running deployments.
+
+Simulates many user sessions with Streamlit's AppTest, all in one process so
+they share st.cache_* state the way sessions on a replica do. Every page is
+exercised in its own phase; RSS, live TensorFlow/Keras objects and
+tracemalloc totals are sampled while it runs, and the harness exits non-zero
+when the steady-state growth per session of any page exceeds the budget, or
+when TensorFlow/Keras objects keep accumulating at all.
+
+    python -m app.memory_harness --sessions 1000 --budget-kb 64
+
+Run time is dominated by the pages themselves; use --pages to focus on one.
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+SAMPLES_PER_PHASE = 10
+
+
+def visit_home(at):
+    at.run()
+
+
+def visit_search(at):
+    at.run()
+    at.sidebar.radio[0].set_value("Search Now").run()
+    at.button(key="predict_button").click().run()
+
+
+def visit_flood_markers(at):
+    at.run()
+    at.sidebar.radio[0].set_value("Flood-Prone Areas").run()
+
+
+def visit_flood_districts(at):
+    visit_flood_markers(at)
+    at.radio[0].set_value("District choropleth").run()
+
+
+def visit_notifications(at):
+    at.run()
+    at.sidebar.radio[0].set_value("Notifications").run()
+
+
+PAGES = {
+    "Home": visit_home,
+    "Search Now": visit_search,
+    "Flood-Prone Areas (markers)": visit_flood_markers,
+    "Flood-Prone Areas (districts)": visit_flood_districts,
+    "Notifications": visit_notifications,
+}
+
+
+def rss_bytes():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        # Linux fallback: resident pages from /proc
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def framework_object_count():
+    """Live Python objects whose type comes from tensorflow or keras"""
+    return sum(
+        1 for obj in gc.get_objects()
+        if isinstance(getattr(type(obj), "__module__", None), str)
+        and type(obj).__module__.startswith(("tensorflow", "keras"))
+    )
+
+
+def sample():
+    gc.collect()
+    return {
+        "rss": rss_bytes(),
+        "traced": tracemalloc.get_traced_memory()[0],
+        "framework_objects": framework_object_count(),
+    }
+
+
+def growth_per_session(samples, key):
+    """Median growth per session across the sampling intervals
+
+    A steady leak grows in every interval, while one-off allocations (a
+    lazily built cache, a dict or arena resize) only show up in one, so the
+    median ignores them where a first-to-last difference would not.
+    """
+    slopes = sorted(
+        (after[key] - before[key]) / (after["sessions"] - before["sessions"])
+        for before, after in zip(samples, samples[1:])
+    )
+    if not slopes:
+        return 0.0
+    middle = len(slopes) // 2
+    return slopes[middle] if len(slopes) % 2 else (slopes[middle - 1] + slopes[middle]) / 2
+
+
+def run_session(visit, timeout):
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    visit(at)
+    if at.exception:
+        raise RuntimeError(f"App raised: {at.exception[0].message}")
+
+
+def run_phase(name, visit, sessions, timeout):
+    # The first visits fill per-page caches; growth is measured from the steady state after them
+    for _ in range(2):
+        run_session(visit, timeout)
+
+    snapshot_before = tracemalloc.take_snapshot()
+    samples = [dict(sample(), sessions=0)]
+    started = time.time()
+    interval = max(1, sessions // SAMPLES_PER_PHASE)
+    for i in range(1, sessions + 1):
+        run_session(visit, timeout)
+        if i % interval == 0 or i == sessions:
+            samples.append(dict(sample(), sessions=i))
+            print(
+                f"  {name}: {i}/{sessions} sessions, RSS {samples[-1]['rss'] / 2**20:.1f} MB, "
+                f"traced {samples[-1]['traced'] / 2**20:.1f} MB, tf/keras objects {samples[-1]['framework_objects']}",
+                flush=True,
+            )
+    snapshot_after = tracemalloc.take_snapshot()
+
+    return {
+        "name": name,
+        "sessions": sessions,
+        "seconds": time.time() - started,
+        "samples": samples,
+        "rss_per_session": growth_per_session(samples, "rss"),
+        "traced_per_session": growth_per_session(samples, "traced"),
+        "objects_per_session": growth_per_session(samples, "framework_objects"),
+        "top_allocators": snapshot_after.compare_to(snapshot_before, "lineno")[:10],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=1000, help="sessions per page")
+    parser.add_argument("--budget-kb", type=float, default=64.0, help="allowed traced memory growth per session, per page")
+    parser.add_argument("--rss-budget-kb", type=float, default=256.0, help="allowed RSS growth per session, per page")
+    parser.add_argument("--object-budget", type=float, default=0.0,
+                        help="allowed growth in live tf/keras objects per session, per page")
+    parser.add_argument("--pages", nargs="*", choices=list(PAGES), default=list(PAGES))
+    parser.add_argument("--frames", type=int, default=1, help="stack frames kept per tracemalloc allocation")
+    parser.add_argument("--timeout", type=float, default=300.0, help="seconds allowed for one script run")
+    args = parser.parse_args()
+
+    # Load the model, score the history and import everything before tracing starts;
+    # tracing those one-off allocations would only slow the run down
+    print("Warming up every page...", flush=True)
+    for name in args.pages:
+        run_session(PAGES[name], args.timeout)
+    tracemalloc.start(args.frames)
+
+    results = []
+    for name in args.pages:
+        print(f"Running {args.sessions} sessions of {name}...", flush=True)
+        results.append(run_phase(name, PAGES[name], args.sessions, args.timeout))
+
+    failed = False
+    print("\nPer-session growth after warm-up")
+    for result in results:
+        over_budget = (
+            result["traced_per_session"] > args.budget_kb * 1024
+            or result["rss_per_session"] > args.rss_budget_kb * 1024
+            or result["objects_per_session"] > args.object_budget
+        )
+        failed |= over_budget
+        print(
+            f"{'FAIL' if over_budget else 'ok  '} {result['name']}: "
+            f"traced {result['traced_per_session'] / 1024:+.1f} KB, RSS {result['rss_per_session'] / 1024:+.1f} KB, "
+            f"tf/keras objects {result['objects_per_session']:+.2f} "
+            f"({result['sessions'] / result['seconds']:.1f} sessions/s)"
+        )
+        if over_budget:
+            for stat in result["top_allocators"]:
+                print(f"       {stat}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""In-process counters and gauges with a Prometheus text exporter.
+
+Set FLOODGUARD_METRICS_DIR to have every process write its metrics to
+<dir>/floodguard-<pid>.prom, for node_exporter's textfile collector.
+"""
+import os
+import threading
+import time
+from collections import defaultdict
+
+EXPORT_INTERVAL = 15
+
+_lock = threading.Lock()
+_counters = defaultdict(float)
+_gauges = {}
+_exporter = None
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    with _lock:
+        _counters[_key(name, labels)] += value
+
+
+def set_gauge(name, value, **labels):
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+def snapshot():
+    """Current values as {"counters": {...}, "gauges": {...}} keyed by (name, labels)"""
+    with _lock:
+        return {"counters": dict(_counters), "gauges": dict(_gauges)}
+
+
+def render_prometheus(extra_labels=None):
+    lines = []
+    values = snapshot()
+    for kind, metric_type in (("counters", "counter"), ("gauges", "gauge")):
+        seen = set()
+        for (name, labels), value in sorted(values[kind].items()):
+            if name not in seen:
+                lines.append(f"# TYPE {name} {metric_type}")
+                seen.add(name)
+            labels = dict(labels, **(extra_labels or {}))
+            label_text = ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+            lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(directory):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"floodguard-{os.getpid()}.prom")
+    # Write then rename so the collector never reads a partial file
+    with open(path + ".tmp", "w") as f:
+        f.write(render_prometheus({"pid": os.getpid()}))
+    os.replace(path + ".tmp", path)
+
+
+def start_exporter():
+    """Start the textfile export thread once per process, if FLOODGUARD_METRICS_DIR is set"""
+    global _exporter
+    directory = os.environ.get("FLOODGUARD_METRICS_DIR")
+    if not directory or _exporter is not None:
+        return
+
+    def export_forever():
+        while True:
+            write_textfile(directory)
+            time.sleep(EXPORT_INTERVAL)
+
+    with _lock:
+        if _exporter is None:
+            _exporter = threading.Thread(target=export_forever, name="metrics-exporter", daemon=True)
+            _exporter.start()
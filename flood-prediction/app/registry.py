@@ -0,0 +1,247 @@
+"""Versioned model registry with background hot-reload.
+
+Versions live in MODELS_DIR/<version>/, either as a bundle written by
+`python -m app.bundle` or as flood_model.keras plus its scaler.pkl; a
+directory without its own scaler is not a version. The served version
+is the one named in MODELS_DIR/CURRENT, or the highest directory name when
+that file is absent (compared number by number, so v10 is above v9). The
+shipped model is published as the v1 bundle. Only if no version loads at all
+does the registry fall back to the legacy flood_model.keras and scaler.pkl in
+app/assets, and it logs a warning when it does. Copy a new version under a temporary name and rename it into place so the
+watcher never sees a half-written directory.
+
+A target that fails to load is logged and skipped: a running registry keeps
+its version, a new one falls back to the newest version that loads.
+
+A new version is loaded and warmed up on the watcher thread, then swapped in
+with a single reference assignment, so requests never wait on a load and
+never trace the graph themselves.
+"""
+import gc
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.models import load_model
+
+from app.bundle import is_bundle, load_bundle
+from app.scoring import MODEL_PATH, SCALER_PATH, columns_to_scale
+
+MODELS_DIR = "app/assets/models"
+POLL_SECONDS = 30
+# Largest batch sent through the graph at once
+MAX_BATCH = 4096
+WARMUP_BATCH_SIZES = [1, 64]
+# TensorFlow keeps eager state per thread and never frees it when the thread
+# exits, and Streamlit runs every script run on a new thread. All inference runs
+# on these long-lived threads instead, so that state is created once.
+INFERENCE_THREADS = 4
+
+N_FEATURES = len(columns_to_scale) + 2
+
+logger = logging.getLogger(__name__)
+
+_inference_pool = ThreadPoolExecutor(max_workers=INFERENCE_THREADS, thread_name_prefix="inference")
+
+
+class ModelVersion:
+    def __init__(self, version, model, scaler):
+        self.version = version
+        self.model = model
+        self.scaler = scaler
+        # One fixed input signature with a free batch dimension: traced once, never retraced
+        signature = [tf.TensorSpec([None, N_FEATURES, 1], tf.float32)]
+        self._forward = tf.function(lambda x: self.model(x, training=False), input_signature=signature)
+        self._forward_with_gradients = tf.function(self._outputs_and_gradients, input_signature=signature)
+
+    def _outputs_and_gradients(self, x):
+        with tf.GradientTape() as tape:
+            tape.watch(x)
+            outputs = self.model(x, training=False)
+        # Each row's output depends only on its own input, so one gradient call covers the batch
+        return outputs, tape.gradient(outputs, x)
+
+    def predict(self, features, verbose=0):
+        """Same call shape as keras Model.predict, so a version can be passed wherever a model is"""
+        return _inference_pool.submit(self._predict, features).result()
+
+    def _predict(self, features):
+        features = np.asarray(features, dtype=np.float32)
+        outputs = [
+            self._forward(tf.constant(features[start:start + MAX_BATCH])).numpy()
+            for start in range(0, len(features), MAX_BATCH)
+        ]
+        return np.concatenate(outputs) if outputs else np.empty((0, 1), dtype=np.float32)
+
+    def predict_with_attributions(self, features):
+        """Probabilities (n, 1) and gradient x input attributions (n, N_FEATURES) from one pass per batch
+
+        An attribution is how far the feature moves the probability, to first
+        order, from the feature's value at zero (its training minimum).
+        """
+        return _inference_pool.submit(self._predict_with_attributions, features).result()
+
+    def _predict_with_attributions(self, features):
+        features = np.asarray(features, dtype=np.float32)
+        outputs, attributions = [np.empty((0, 1), dtype=np.float32)], [np.empty((0, N_FEATURES), dtype=np.float32)]
+        for start in range(0, len(features), MAX_BATCH):
+            batch = features[start:start + MAX_BATCH]
+            batch_outputs, gradients = self._forward_with_gradients(tf.constant(batch))
+            outputs.append(batch_outputs.numpy())
+            attributions.append((gradients.numpy() * batch).reshape(len(batch), N_FEATURES))
+        return np.concatenate(outputs), np.concatenate(attributions)
+
+    def warm_up(self):
+        for batch_size in WARMUP_BATCH_SIZES:
+            self.predict(np.zeros((batch_size, N_FEATURES, 1), dtype=np.float32))
+        self.predict_with_attributions(np.zeros((1, N_FEATURES, 1), dtype=np.float32))
+
+
+def version_key(name):
+    """Sort key comparing the digit runs of a version name as numbers: v2 < v9 < v10"""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+
+def is_legacy_version(path):
+    return os.path.exists(os.path.join(path, "flood_model.keras")) and os.path.exists(os.path.join(path, "scaler.pkl"))
+
+
+def list_versions(models_dir=MODELS_DIR):
+    """Published versions, oldest first"""
+    if not os.path.isdir(models_dir):
+        return []
+    return sorted(
+        (
+            name for name in os.listdir(models_dir)
+            if not name.startswith(".") and (
+                is_bundle(os.path.join(models_dir, name))
+                or is_legacy_version(os.path.join(models_dir, name))
+            )
+        ),
+        key=version_key,
+    )
+
+
+def target_version(models_dir=MODELS_DIR):
+    """Version that should be served, or None for the legacy model in app/assets"""
+    pointer = os.path.join(models_dir, "CURRENT")
+    if os.path.exists(pointer):
+        with open(pointer) as f:
+            version = f.read().strip()
+        if version:
+            return version
+    versions = list_versions(models_dir)
+    return versions[-1] if versions else None
+
+
+def load_version(version, models_dir=MODELS_DIR):
+    if version is not None and is_bundle(os.path.join(models_dir, version)):
+        model, scaler, _ = load_bundle(os.path.join(models_dir, version))
+        loaded = ModelVersion(version, model, scaler)
+        loaded.warm_up()
+        return loaded
+
+    if version is None:
+        logger.warning("No model bundle could be loaded; serving the legacy %s and %s", MODEL_PATH, SCALER_PATH)
+        model_path, scaler_path = MODEL_PATH, SCALER_PATH
+    else:
+        path = os.path.join(models_dir, version)
+        # Never pair a version's model with another model's scaler
+        if not is_legacy_version(path):
+            raise FileNotFoundError(f"{path} is neither a bundle nor flood_model.keras with its scaler.pkl")
+        model_path = os.path.join(path, "flood_model.keras")
+        scaler_path = os.path.join(path, "scaler.pkl")
+        logger.info("Loading legacy version %s from keras and pickle files; publish it with `python -m app.bundle`", version)
+
+    import joblib
+
+    loaded = ModelVersion(version or "default", load_model(model_path, compile=False), joblib.load(scaler_path))
+    loaded.warm_up()
+    return loaded
+
+
+class ModelRegistry:
+    def __init__(self, models_dir=MODELS_DIR, poll_seconds=POLL_SECONDS):
+        self.models_dir = models_dir
+        self.poll_seconds = poll_seconds
+        self._failed_version = None
+        self._watcher = None
+        self._swap_callbacks = []
+        self._current = self._load_initial()
+
+    def _load_initial(self):
+        """The target version, or if it fails to load the newest version that does, then the legacy model"""
+        target = target_version(self.models_dir)
+        fallbacks = [version for version in reversed(list_versions(self.models_dir)) if version != target]
+        for version in [target] + fallbacks + ([None] if target is not None else []):
+            try:
+                return load_version(version, self.models_dir)
+            except Exception:
+                if version is None:
+                    raise
+                logger.exception("Failed to load model version %s at startup", version)
+                if version == target:
+                    # Like reload(), don't retry it until the target changes
+                    self._failed_version = target
+
+    @property
+    def current(self):
+        """The served version; hold on to it for the duration of a request"""
+        return self._current
+
+    @property
+    def version(self):
+        return self._current.version
+
+    def predict(self, features, verbose=0):
+        return self._current.predict(features)
+
+    def on_swap(self, callback):
+        """Call callback(new_version) on the watcher thread after every swap"""
+        self._swap_callbacks.append(callback)
+
+    def reload(self):
+        """Load the target version if it differs from the served one. Returns True on swap"""
+        version = target_version(self.models_dir) or "default"
+        if version in (self._current.version, self._failed_version):
+            return False
+
+        logger.info("Loading model version %s", version)
+        try:
+            loaded = load_version(None if version == "default" else version, self.models_dir)
+        except Exception:
+            logger.exception("Failed to load model version %s; still serving %s", version, self._current.version)
+            self._failed_version = version
+            return False
+
+        self._current = loaded
+        self._failed_version = None
+        for callback in self._swap_callbacks:
+            try:
+                callback(loaded)
+            except Exception:
+                logger.exception("Swap callback failed")
+        # Let the previous version's weights and graph go before the next load
+        gc.collect()
+        logger.info("Now serving model version %s", version)
+        return True
+
+    def start(self):
+        if self._watcher is not None:
+            return
+
+        def watch_forever():
+            while True:
+                time.sleep(self.poll_seconds)
+                try:
+                    self.reload()
+                except Exception:
+                    logger.exception("Model watcher iteration failed")
+
+        self._watcher = threading.Thread(target=watch_forever, name="model-registry", daemon=True)
+        self._watcher.start()
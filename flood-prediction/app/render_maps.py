@@ -0,0 +1,171 @@
+"""Render static flood risk maps from a precomputed predictions table.
+
+    python -m app.scoring --output build/predictions.csv
+    python -m app.render_maps --predictions build/predictions.csv --output-dir build/maps
+
+Writes a national map (index.html) and one map per district under
+districts/. Each district shows the predictions of its nearest weather station
+(the District column of the predictions table holds station names). Maps are
+rendered in parallel across a process pool, and a map is only re-rendered when
+the rows it is built from have changed, so the output directory can be synced
+to a CDN or plain file server after every run.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from app.districts import district_stations
+
+MANIFEST_NAME = "manifest.json"
+# Bump when the map layout changes so every map is re-rendered
+RENDERER_VERSION = 2
+
+MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def slugify(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def summarize_predictions(predictions):
+    """One row per district with its centroid, nearest station, mean/max probability and monthly profile"""
+    stations = predictions.groupby("District").agg(
+        LATITUDE=("LATITUDE", "mean"),
+        LONGITUDE=("LONGITUDE", "mean"),
+        Mean_Probability=("Flood_Probability", "mean"),
+        Max_Probability=("Flood_Probability", "max"),
+    )
+    if "Month" in predictions:
+        monthly = predictions.pivot_table(index="District", columns="Month", values="Flood_Probability", aggfunc="mean")
+        monthly.columns = [MONTH_NAMES[int(m) - 1] for m in monthly.columns]
+        stations = stations.join(monthly)
+    districts = district_stations(stations)
+    return districts.join(stations.drop(columns=["LATITUDE", "LONGITUDE"]), on="Station")
+
+
+def risk_color(probability):
+    return "red" if probability >= 0.5 else "blue"
+
+
+def render_national_map(rows):
+    import folium
+
+    m = folium.Map(location=[23.6850, 90.3563], zoom_start=7)
+    for row in rows:
+        link = f'<a href="districts/{slugify(row["District"])}.html" target="_top">{row["District"]}</a>'
+        folium.CircleMarker(
+            location=[row["LATITUDE"], row["LONGITUDE"]],
+            radius=8,
+            color=risk_color(row["Mean_Probability"]),
+            fill=True,
+            fill_opacity=0.7,
+            popup=f"{link}<br>Mean Flood Risk: {row['Mean_Probability']:.2f}",
+        ).add_to(m)
+    return m
+
+
+def render_district_map(row):
+    import folium
+
+    monthly = "".join(
+        f"<tr><td>{month}</td><td>{row[month]:.2f}</td></tr>"
+        for month in MONTH_NAMES if row.get(month) is not None
+    )
+    m = folium.Map(location=[row["LATITUDE"], row["LONGITUDE"]], zoom_start=10)
+    folium.CircleMarker(
+        location=[row["LATITUDE"], row["LONGITUDE"]],
+        radius=12,
+        color=risk_color(row["Mean_Probability"]),
+        fill=True,
+        fill_opacity=0.7,
+        popup=folium.Popup(
+            f"<b>{row['District']}</b><br>Nearest station: {row['Station']}<br>Mean Flood Risk: {row['Mean_Probability']:.2f}"
+            f"<br>Max Flood Risk: {row['Max_Probability']:.2f}<table>{monthly}</table>",
+            max_width=250,
+        ),
+    ).add_to(m)
+    return m
+
+
+def render_job(kind, rows, html_path, png):
+    """Worker entry point: build one map and write it to disk"""
+    m = render_national_map(rows) if kind == "national" else render_district_map(rows[0])
+    m.save(html_path)
+    if png:
+        # Needs selenium and a headless Firefox (geckodriver) on the worker
+        with open(os.path.splitext(html_path)[0] + ".png", "wb") as f:
+            f.write(m._to_png(delay=3))
+    return html_path
+
+
+def rows_digest(rows, png):
+    payload = json.dumps({"version": RENDERER_VERSION, "png": png, "rows": rows}, sort_keys=True, default=float)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def plan_jobs(summary, output_dir):
+    rows = json.loads(summary.to_json(orient="records"))
+    jobs = [("national", rows, os.path.join(output_dir, "index.html"))]
+    for row in rows:
+        jobs.append(("district", [row], os.path.join(output_dir, "districts", f"{slugify(row['District'])}.html")))
+    return jobs
+
+
+def render_all(predictions, output_dir, png=False, workers=None, force=False):
+    os.makedirs(os.path.join(output_dir, "districts"), exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    jobs = plan_jobs(summarize_predictions(predictions), output_dir)
+    pending = []
+    for kind, rows, html_path in jobs:
+        key = os.path.relpath(html_path, output_dir)
+        digest = rows_digest(rows, png)
+        if not force and manifest.get(key) == digest and os.path.exists(html_path):
+            continue
+        pending.append((kind, rows, html_path, png, key, digest))
+
+    print(f"{len(pending)} maps to render, {len(jobs) - len(pending)} unchanged")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(render_job, *job[:4]): job for job in pending}
+        for future in as_completed(futures):
+            kind, rows, html_path, png, key, digest = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Failed to render {key}: {e}")
+                manifest.pop(key, None)
+                continue
+            manifest[key] = digest
+
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--predictions", default="build/predictions.csv", help="CSV with District, LATITUDE, LONGITUDE, Flood_Probability")
+    parser.add_argument("--output-dir", default="build/maps")
+    parser.add_argument("--month", type=int, help="only use predictions for this month (1-12)")
+    parser.add_argument("--png", action="store_true", help="also write a PNG screenshot of every map")
+    parser.add_argument("--workers", type=int, help="number of renderer processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="re-render every map")
+    args = parser.parse_args()
+
+    predictions = pd.read_csv(args.predictions)
+    if args.month:
+        predictions = predictions[predictions["Month"] == args.month]
+    render_all(predictions, args.output_dir, png=args.png, workers=args.workers, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
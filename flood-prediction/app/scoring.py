@@ -0,0 +1,137 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+DATASET_PATH = "app/assets/flood_dataset.csv"
+MODEL_PATH = "app/assets/flood_model.keras"
+SCALER_PATH = "app/assets/scaler.pkl"
+
+# Feature order the scaler and model were trained with
+columns_to_scale = [
+    'Max Temp', 'Min Temp', 'Rainfall', 'Relative Humidity',
+    'Wind Speed', 'Cloud Coverage', 'Bright Sunshine',
+    'X_COR', 'Y_COR', 'ALT'
+]
+
+# Stations left out of training
+excluded_stations = ['Ishurdi', 'Maijdee Court']
+
+
+def prepare_features(frame, scaler):
+    """Scale the climate inputs and append the cyclic month encoding, shaped (n, 12, 1) for the model"""
+    scaled = scaler.transform(frame[columns_to_scale])
+    month = frame['Month'].to_numpy(dtype=float)
+    features = np.column_stack([
+        scaled,
+        np.sin(2 * np.pi * month / 12),
+        np.cos(2 * np.pi * month / 12),
+    ])
+    return features.reshape(features.shape[0], features.shape[1], 1).astype(np.float32)
+
+
+def load_station_records(path=DATASET_PATH):
+    """Read the historical station-month records used for the risk map"""
+    df = pd.read_csv(path)
+    df = df.drop(['A', 'Period', 'Station Number'], axis=1)
+    df.rename(columns={'Station Names': 'District'}, inplace=True)
+    return df[~df['District'].isin(excluded_stations)].reset_index(drop=True)
+
+
+def attribution_frame(attributions, index=None):
+    """Per-feature attributions by input column (columns_to_scale + Month), the two month encodings summed"""
+    frame = pd.DataFrame(attributions[:, :len(columns_to_scale)], columns=columns_to_scale, index=index)
+    frame['Month'] = attributions[:, len(columns_to_scale):].sum(axis=1)
+    return frame
+
+
+def predict_frame(model, features, index=None, explain=False):
+    """Flood_Probability, plus one '<column> Attribution' column per input when explain is set"""
+    if not explain:
+        return pd.DataFrame({'Flood_Probability': model.predict(features, verbose=0).flatten()}, index=index)
+    # Needs a registry ModelVersion; the attributions come out of the same batched pass
+    probabilities, attributions = model.predict_with_attributions(features)
+    frame = attribution_frame(attributions, index).add_suffix(' Attribution')
+    frame.insert(0, 'Flood_Probability', probabilities.flatten())
+    return frame
+
+
+def score_station_records(model, scaler, records, explain=False):
+    """Score every record in one batched predict call"""
+    features = prepare_features(records, scaler)
+    results_df = records[['District', 'YEAR', 'Month', 'LATITUDE', 'LONGITUDE']].copy()
+    return results_df.join(predict_frame(model, features, results_df.index, explain))
+
+
+def score_points(model, scaler, climatology, points, monitor=None, explain=False):
+    """Score arbitrary (LATITUDE, LONGITUDE, Month) rows using interpolated climate inputs
+
+    Pass a drift.DriftMonitor to add the scored rows to its live histograms.
+    """
+    inputs = climatology.lookup(points['LATITUDE'], points['LONGITUDE'], points['Month'])
+    features = prepare_features(inputs, scaler)
+    results_df = points.drop(columns=['Flood_Probability'], errors='ignore').join(predict_frame(model, features, points.index, explain))
+    if monitor is not None:
+        monitor.observe(features, results_df['Flood_Probability'], points['LATITUDE'], points['LONGITUDE'])
+    return results_df
+
+
+def sweep_inputs(base_row, axes):
+    """Every combination of the axis values, with the other inputs held at base_row
+
+    base_row maps columns_to_scale + ['Month'] to values; axes maps one or more
+    of those columns to the values to try. Rows vary fastest along the last axis.
+    """
+    columns = list(axes)
+    grids = np.meshgrid(*(np.asarray(axes[column], dtype=float) for column in columns), indexing='ij')
+    n_rows = grids[0].size
+    frame = pd.DataFrame({column: np.full(n_rows, base_row[column], dtype=float) for column in columns_to_scale + ['Month']})
+    for column, grid in zip(columns, grids):
+        frame[column] = grid.ravel()
+    return frame
+
+
+def score_sweep(model, scaler, base_row, axes):
+    """Score a what-if grid in one batched call; returns the swept inputs with Flood_Probability"""
+    inputs = sweep_inputs(base_row, axes)
+    results_df = inputs[list(axes)].copy()
+    results_df['Flood_Probability'] = model.predict(prepare_features(inputs, scaler), verbose=0).flatten()
+    return results_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score the station history and write the predictions table")
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    parser.add_argument("--points", help="CSV of LATITUDE, LONGITUDE, Month to score instead of the station history")
+    parser.add_argument("--output", default="build/predictions.csv")
+    parser.add_argument("--explain", action="store_true", help="add a gradient x input attribution column per input")
+    args = parser.parse_args()
+
+    from app import metrics
+    from app.climatology import load_index
+    from app.drift import DriftMonitor, load_baseline
+    from app.registry import ModelRegistry
+
+    model = ModelRegistry().current
+    scaler = model.scaler
+    monitor = None
+    if args.points:
+        monitor = DriftMonitor(load_baseline(model, scaler))
+        results_df = score_points(model, scaler, load_index(), pd.read_csv(args.points), monitor=monitor, explain=args.explain)
+    else:
+        results_df = score_station_records(model, scaler, load_station_records(args.dataset), explain=args.explain)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    results_df.to_csv(args.output, index=False)
+    print(f"Wrote {len(results_df)} predictions to {args.output}")
+
+    scores = monitor.scores() if monitor is not None else None
+    if scores:
+        worst = sorted(scores.items(), key=lambda item: -item[1])[:3]
+        print("Largest input drift (PSI): " + ", ".join(f"{feature} {value:.2f}" for feature, value in worst))
+    if monitor is not None and os.environ.get("FLOODGUARD_METRICS_DIR"):
+        metrics.write_textfile(os.environ["FLOODGUARD_METRICS_DIR"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""SQLite files shared by every thread and process on the host.
+
+The forecast cache and the risk history both keep their tables in a local
+SQLite file in WAL mode, so readers never block the single writer, with one
+connection per thread.
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class SQLiteDatabase:
+    def __init__(self, path, schema=()):
+        """Open (creating if needed) the file at path and run the schema statements"""
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self.connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        for statement in schema:
+            conn.execute(statement)
+
+    def connection(self):
+        """This thread's connection, in autocommit mode"""
+        # sqlite3 connections can't be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Write transaction that takes the database lock up front, so read-then-write is atomic across processes"""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
@@ -0,0 +1,141 @@
+"""Spatially indexed prediction table for viewport-driven marker maps.
+
+Rows are sorted by a fine lat/lng grid cell, so the rows inside a viewport are
+found with one searchsorted per grid row instead of a scan. Below DETAIL_ZOOM
+the rows in view are aggregated into screen-sized cells; from DETAIL_ZOOM up
+there is one marker per location. Either way a map only receives the markers
+it can show.
+"""
+import folium
+import numpy as np
+
+# Size of the index grid, in degrees
+FINE_CELL_DEGREES = 0.01
+# Rows are aggregated into cells of about this many pixels below DETAIL_ZOOM
+CELL_PIXELS = 48
+DETAIL_ZOOM = 9
+TILE_SIZE = 256
+
+
+def cell_degrees(zoom):
+    """Width in degrees of an aggregation cell at this zoom level"""
+    return CELL_PIXELS * 360 / (TILE_SIZE * 2 ** zoom)
+
+
+def snap_view(south, west, north, east, zoom):
+    """Viewport grown to whole aggregation cells, so small pans map to the same view"""
+    zoom = int(zoom)
+    step = cell_degrees(zoom)
+    return (
+        round(float(np.floor(south / step)) * step, 6),
+        round(float(np.floor(west / step)) * step, 6),
+        round(float(np.ceil(north / step)) * step, 6),
+        round(float(np.ceil(east / step)) * step, 6),
+        zoom,
+    )
+
+
+class PredictionIndex:
+    def __init__(self, predictions):
+        """predictions has LATITUDE, LONGITUDE, Month, Flood_Probability and District columns"""
+        latitude = predictions['LATITUDE'].to_numpy(dtype=float)
+        longitude = predictions['LONGITUDE'].to_numpy(dtype=float)
+        self.south = latitude.min()
+        self.west = longitude.min()
+        self.n_cols = int((longitude.max() - self.west) / FINE_CELL_DEGREES) + 1
+        rows, cols = self._cell(latitude, longitude)
+        self.n_rows = int(rows.max()) + 1
+
+        order = np.argsort(rows * self.n_cols + cols, kind='stable')
+        self.keys = (rows * self.n_cols + cols)[order]
+        self.latitude = latitude[order]
+        self.longitude = longitude[order]
+        self.month = predictions['Month'].to_numpy()[order]
+        self.probability = predictions['Flood_Probability'].to_numpy(dtype=float)[order]
+        self.district = predictions['District'].to_numpy()[order]
+        # Rows at exactly the same point (a station's monthly records) share a location id
+        self.location = np.unique(np.column_stack([self.latitude, self.longitude]), axis=0, return_inverse=True)[1].reshape(-1)
+
+    def _cell(self, latitude, longitude):
+        rows = np.floor((np.asarray(latitude) - self.south) / FINE_CELL_DEGREES).astype(np.int64)
+        cols = np.floor((np.asarray(longitude) - self.west) / FINE_CELL_DEGREES).astype(np.int64)
+        return rows, cols
+
+    def query(self, south, west, north, east, month=None):
+        """Positions of the rows inside the bounds, optionally for one month"""
+        (row_lo, row_hi), (col_lo, col_hi) = (np.clip(a, 0, n - 1) for a, n in zip(
+            self._cell([south, north], [west, east]), (self.n_rows, self.n_cols)))
+        rows = np.arange(row_lo, row_hi + 1)
+        starts = np.searchsorted(self.keys, rows * self.n_cols + col_lo, side='left')
+        ends = np.searchsorted(self.keys, rows * self.n_cols + col_hi, side='right')
+
+        # Concatenate the [start, end) runs without a Python loop
+        lengths = ends - starts
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+        # The edge cells stick out of the bounds
+        mask = (
+            (self.latitude[positions] >= south) & (self.latitude[positions] <= north)
+            & (self.longitude[positions] >= west) & (self.longitude[positions] <= east)
+        )
+        if month is not None:
+            mask &= self.month[positions] == month
+        return positions[mask]
+
+    def markers(self, view, month=None):
+        """One aggregated marker per cell (or per location at DETAIL_ZOOM and above) inside a view
+
+        view is (south, west, north, east, zoom) as returned by snap_view. Returns a
+        dict of equal-length arrays: LATITUDE, LONGITUDE, Count, Mean_Probability,
+        Max_Probability and District (None for aggregates of several locations).
+        """
+        south, west, north, east, zoom = view
+        positions = self.query(south, west, north, east, month)
+        if zoom >= DETAIL_ZOOM:
+            groups = self.location[positions]
+        else:
+            step = cell_degrees(zoom)
+            groups = (
+                np.floor(self.latitude[positions] / step).astype(np.int64) * 1_000_000
+                + np.floor(self.longitude[positions] / step).astype(np.int64)
+            )
+        _, first, inverse = np.unique(groups, return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
+
+        count = np.bincount(inverse)
+        max_probability = np.full(len(count), -np.inf)
+        np.maximum.at(max_probability, inverse, self.probability[positions])
+        # A group covers a single location when its smallest and largest location id agree
+        lowest = np.full(len(count), np.iinfo(np.int64).max)
+        highest = np.full(len(count), -1)
+        np.minimum.at(lowest, inverse, self.location[positions])
+        np.maximum.at(highest, inverse, self.location[positions])
+        district = np.where(lowest == highest, self.district[positions][first], None)
+
+        return {
+            'LATITUDE': np.bincount(inverse, weights=self.latitude[positions]) / count,
+            'LONGITUDE': np.bincount(inverse, weights=self.longitude[positions]) / count,
+            'Count': count,
+            'Mean_Probability': np.bincount(inverse, weights=self.probability[positions]) / count,
+            'Max_Probability': max_probability,
+            'District': district,
+        }
+
+
+def marker_layer(markers):
+    """Feature group with a circle per marker, sized by how many rows it stands for"""
+    layer = folium.FeatureGroup(name="Flood risk")
+    for lat, lng, count, mean, peak, district in zip(
+        markers['LATITUDE'], markers['LONGITUDE'], markers['Count'],
+        markers['Mean_Probability'], markers['Max_Probability'], markers['District'],
+    ):
+        title = district if district is not None else f"{count} records"
+        folium.CircleMarker(
+            location=[lat, lng],
+            radius=5 + 3 * np.log10(count),
+            color='red' if mean >= 0.5 else 'blue',
+            fill=True,
+            fill_opacity=0.7,
+            tooltip=f"{title}: mean flood risk {mean:.2f}, peak {peak:.2f} ({count} records)",
+        ).add_to(layer)
+    return layer
@@ -1,5 +1,29 @@
+import os
+import sys
+import time
+
 import streamlit as st
 
+# Make the `app` package importable when launched with `streamlit run pages/dashboard.py`
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app.history import default_store
+
+HISTORY_DAYS = 90
+
+
+def risk_label(probability):
+    if probability >= 0.75:
+        return "Critical"
+    if probability >= 0.5:
+        return "High"
+    if probability >= 0.25:
+        return "Moderate"
+    return "Low"
+
+
 # CSS for styling
 def add_custom_css():
     st.markdown("""
@@ -29,12 +53,27 @@ def display_page():
     add_custom_css()
     st.markdown("<h1 class='dashboard-header'>Flood Prediction Dashboard</h1>", unsafe_allow_html=True)
 
-    st.markdown("<h2>Flood Levels Across Regions</h2>", unsafe_allow_html=True)
-    st.markdown("""
-    <div class="stats-grid">
-        <div class="stat-card"><h3>Region A</h3><p>High</p></div>
-        <div class="stat-card"><h3>Region B</h3><p>Moderate</p></div>
-        <div class="stat-card"><h3>Region C</h3><p>Low</p></div>
-        <div class="stat-card"><h3>Region D</h3><p>Critical</p></div>
-    </div>
-    """, unsafe_allow_html=True)
+    store = default_store()
+    latest = store.latest_snapshots()
+    if latest.empty:
+        st.info("No seasonal outlook recorded yet. Run `python -m app.history outlook` to add one.")
+        return
+
+    st.markdown("<h2>Seasonal Flood Outlook</h2>", unsafe_allow_html=True)
+    st.caption(
+        f"Typical flood risk for {latest['ts'].max():%B %Y} from the monthly climatology of each district. "
+        "It is not a live forecast and no warnings are issued from it."
+    )
+    highest = latest.sort_values("probability", ascending=False).head(4)
+    cards = "".join(
+        f"<div class='stat-card'><h3>{row.district}</h3><p>{risk_label(row.probability)} ({row.probability:.0%})</p></div>"
+        for row in highest.itertuples(index=False)
+    )
+    st.markdown(f"<div class='stats-grid'>{cards}</div>", unsafe_allow_html=True)
+
+    district = st.selectbox("District", sorted(latest["district"]), index=sorted(latest["district"]).index(highest.iloc[0]["district"]))
+    history = store.snapshots(district, start=time.time() - HISTORY_DAYS * 24 * 3600)
+    st.line_chart(history.set_index("ts")[["probability", "max_probability"]])
+
+    st.markdown("<h2>Recent Warnings</h2>", unsafe_allow_html=True)
+    st.dataframe(store.latest_warnings(20)[["ts", "district", "level", "probability"]], hide_index=True)
@@ -23,16 +23,18 @@
 #     # Display the map
 #     folium_static(m)
 
-import openmeteo_requests
-import requests_cache
+import os
+import sys
+
 import pandas as pd
 import folium
-from retry_requests import retry
 
-# Setup the Open-Meteo API client with cache and retry on error
-cache_session = requests_cache.CachedSession('.cache', expire_after=3600)
-retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-openmeteo = openmeteo_requests.Client(session=retry_session)
+# Make the `app` package importable when run as `python pages/flood_prone_area.py`
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app.forecast_cache import get_forecast
 
 # List of coordinates for the desired locations in Bangladesh
 locations = {
@@ -45,12 +47,8 @@ locations = {
     "Cox's Bazar": {"latitude": 21.4514, "longitude": 92.0112}
 }
 
-# API URL and parameters for flood risk prediction (adjusting based on available weather data)
-url = "https://api.open-meteo.com/v1/forecast"
-params = {
-    "hourly": "precipitation,temperature_2m,wind_speed_10m",  # Precipitation, temperature, and wind speed
-    "timezone": "Asia/Dhaka"
-}
+# Hourly variables for flood risk prediction (adjusting based on available weather data)
+hourly_variables = ["precipitation", "temperature_2m", "wind_speed_10m"]  # Precipitation, temperature, and wind speed
 
 # Initialize folium map
 flood_map = folium.Map(location=[23.8103, 90.4125], zoom_start=7)
@@ -59,42 +57,23 @@ flood_map = folium.Map(location=[23.8103, 90.4125], zoom_start=7)
 for location, coords in locations.items():
     print(f"Fetching data for {location}...")
 
-    # Update latitude and longitude for each location
-    params["latitude"] = coords["latitude"]
-    params["longitude"] = coords["longitude"]
-    
-    # Fetch data from Open-Meteo API
-    responses = openmeteo.weather_api(url, params=params)
+    # Fetch data through the shared forecast cache (snapped to a grid cell)
+    response = get_forecast(coords["latitude"], coords["longitude"], hourly_variables, timezone="Asia/Dhaka")
 
     # Check if response is valid
-    if responses:
-        response = responses[0]
-        print(f"Coordinates: {response.Latitude()}°N {response.Longitude()}°E")
-        print(f"Elevation: {response.Elevation()} m asl")
-        print(f"Timezone: {response.Timezone()} {response.TimezoneAbbreviation()}")
-        print(f"Timezone difference to GMT+0: {response.UtcOffsetSeconds()} s")
+    if response and "hourly" in response:
+        print(f"Coordinates: {response['latitude']}°N {response['longitude']}°E")
+        print(f"Elevation: {response['elevation']} m asl")
+        print(f"Timezone: {response['timezone']} {response['timezone_abbreviation']}")
+        print(f"Timezone difference to GMT+0: {response['utc_offset_seconds']} s")
 
         # Process hourly data for temperature, precipitation, and wind speed
-        hourly = response.Hourly()
-
-        # Fetch hourly temperature, precipitation, and wind speed data
-        hourly_temperature_2m = hourly.Variables(0).ValuesAsNumpy()
-        hourly_precipitation = hourly.Variables(1).ValuesAsNumpy()
-        hourly_wind_speed_10m = hourly.Variables(2).ValuesAsNumpy()
-
-        # Create a DataFrame with the relevant data
-        hourly_data = {
-            "date": pd.date_range(
-                start=pd.to_datetime(hourly.Time(), unit="s", utc=True),
-                end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True),
-                freq=pd.Timedelta(seconds=hourly.Interval() * 60),
-                inclusive="left"
-            )
-        }
-
-        hourly_data["temperature_2m"] = hourly_temperature_2m
-        hourly_data["precipitation"] = hourly_precipitation
-        hourly_data["wind_speed_10m"] = hourly_wind_speed_10m
+        hourly = response["hourly"]
+        hourly_data = {"date": pd.to_datetime(hourly["time"])}
+
+        hourly_data["temperature_2m"] = hourly["temperature_2m"]
+        hourly_data["precipitation"] = hourly["precipitation"]
+        hourly_data["wind_speed_10m"] = hourly["wind_speed_10m"]
 
         # Create DataFrame for analysis
         hourly_dataframe = pd.DataFrame(data=hourly_data)
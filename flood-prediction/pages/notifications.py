@@ -24,6 +24,9 @@
 #     ]
 #     for warning in warnings:
 #         st.write(warning)
+import streamlit as st
+
+from app.history import default_store
 from app.mongodb import save_subscription  
 
 def notifications_page():
@@ -50,10 +53,8 @@ def notifications_page():
             
     # Example: Display recent warnings
     st.subheader("Recent Flood Warnings")
-    warnings = [
-        "Flood warning issued for Dhaka on 2023-10-15.",
-        "Moderate flood risk in Sylhet on 2023-10-14.",
-        "No active warnings for Chittagong.",
-    ]
-    for warning in warnings:
-        st.write(warning)
+    warnings = default_store().latest_warnings(10)
+    if warnings.empty:
+        st.write("No flood warnings have been issued yet.")
+    for warning in warnings.itertuples(index=False):
+        st.write(f"{warning.message} ({warning.ts:%Y-%m-%d %H:%M})")